@@ -0,0 +1,277 @@
+import argparse
+import csv
+import importlib
+import json
+import os
+import sys
+import time
+import numpy as np
+import ConcreteModule
+import RebarModule
+import MshModule
+import ParametricModule
+import SectionModule
+import NdmModule
+import ParallelModule
+import EnvelopeModule
+import ExportModule
+
+
+# Пакетный расчет сечения по НДМ из командной строки без графического интерфейса
+# Заменяет скрипты Primer*_Solve.py: сечение, материалы, точка начала координат и загружения задаются параметрами,
+# результаты записываются в папку --output:
+#   results.csv - по строке на загружение (сходимость, число итераций, экстремальные деформации и напряжения),
+#   summary.json - сводка расчета с огибающими и определяющими загружениями,
+#   results.h5 и results.xdmf - напряжения и деформации всех волокон (ключ --hdf5, требуется h5py).
+# Код завершения: 0 - все загружения сошлись, 1 - есть несошедшиеся загружения.
+# Пример (аналог Primer40SP52_Solve.py, усилия в кН и кН*м):
+#   python BatchModule.py Primer40SP52.msh --loads loads.csv --scale 0.001 --origin -0.3 0.2 --concrete B25 --rebar A400
+# Файл загружений CSV содержит заголовок со столбцами Nz, Mx, My (МН, МН*м) и необязательным столбцом case;
+# файлы Parquet (.parquet) читаются с помощью pandas
+
+
+# Исполнители расчета: имя -> функция (Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, волокна..., deltaMN, **kwargs),
+# возвращающая sigmab, epsb, sigmaS, epsS и NDMStatus с массивами по загружениям.
+# Кроме перечисленных, исполнитель можно задать в виде "модуль:функция" с той же сигнатурой
+def _serial(*args, workers=None, **kwargs):
+    return ParallelModule.NDMParallel(*args, workers=1, fullOutput=True, **kwargs)
+
+
+def _parallel(*args, workers=None, **kwargs):
+    return ParallelModule.NDMParallel(*args, workers=workers, fullOutput=True, **kwargs)
+
+
+# Векторизованный расчет NDMBatch выполняется только по секущим модулям на NumPy
+def _batch(*args, workers=None, method="secant", backend="numpy", **kwargs):
+    if method != "secant" or backend != "numpy":
+        raise ValueError("batch executor supports only method 'secant' and backend 'numpy'")
+    return NdmModule.NDMBatch(*args, fullOutput=True, **kwargs)
+
+
+def _sequence(*args, workers=None, **kwargs):
+    return NdmModule.NDMSequence(*args, **kwargs)
+
+
+EXECUTORS = {
+    "serial": _serial,
+    "parallel": _parallel,
+    "batch": _batch,
+    "sequence": _sequence,
+}
+
+
+# Функция возвращает исполнителя по имени из EXECUTORS или по строке "модуль:функция"
+def getExecutor(name):
+    if name in EXECUTORS:
+        return EXECUTORS[name]
+    if ":" in name:
+        module, func = name.split(":", 1)
+        return getattr(importlib.import_module(module), func)
+    raise ValueError("Unknown executor: " + name)
+
+
+# Функция читает загружения из файла CSV или Parquet
+# Возвращает имена загружений и массивы Nz, Mx, My, умноженные на scale
+def readLoads(file, scale=1.0):
+    if file.lower().endswith(".parquet"):
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError("pandas is required to read Parquet load files")
+        table = pandas.read_parquet(file)
+        columns = {str(c).lower(): c for c in table.columns}
+        rows = {k: table[columns[k]].to_numpy() for k in columns}
+    else:
+        with open(file, newline="") as f:
+            reader = csv.DictReader(line for line in f if line.strip() and not line.startswith("#"))
+            data = [{k.strip().lower(): v for k, v in row.items() if k is not None} for row in reader]
+        rows = {k: np.array([row[k] for row in data]) for k in (data[0] if data else {})}
+    for k in ("nz", "mx", "my"):
+        if k not in rows:
+            raise ValueError("Load file %s has no column %s" % (file, k.capitalize()))
+    n = len(rows["nz"])
+    names = [str(v) for v in rows["case"]] if "case" in rows else [str(i + 1) for i in range(n)]
+    Nz, Mx, My = [np.asarray(rows[k], dtype=float) * scale for k in ("nz", "mx", "my")]
+    return names, Nz, Mx, My
+
+
+# Функция возвращает массивы сечения: из файла сетки .msh (без gmsh) или параметрического сечения
+# section - путь к файлу сетки или описание "тип:параметр=значение,..." (например, "rectangle:b=0.4,h=0.6,cover=0.05,diam=0.025")
+# origin - точка (X, Y), относительно которой вычисляются координаты волокон (см. SectionModule.getXY)
+# materials - словарь имен физических групп и классов материалов для сечений из нескольких материалов
+def loadSection(section, origin=None, materials=None):
+    ConcreteMat = RebarMat = None
+    if os.path.exists(section):
+        info = MshModule.getSectionInfo(section, materials)
+        if materials is not None:
+            ConcreteMat, RebarMat = info[9], info[10]
+    else:
+        kind, _, params = section.partition(":")
+        builders = {"rectangle": ParametricModule.rectangleSection, "tee": ParametricModule.teeSection,
+                    "i": ParametricModule.iSection, "circle": ParametricModule.circleSection}
+        if kind not in builders:
+            raise ValueError("Section file not found and unknown section type: " + section)
+        spec = {}
+        for item in filter(None, params.split(",")):
+            k, v = item.split("=")
+            spec[k.strip()] = int(v) if k.strip() in ("n", "nx", "ny", "nTop") else float(v)
+        info = builders[kind](**spec)
+    ConcreteX, ConcreteY, ConcreteArea, RebarDiam, RebarArea, RebarX, RebarY = info[1], info[2], info[3], info[5], info[6], info[7], info[8]
+    if origin is not None:
+        ConcreteX, ConcreteY, RebarX, RebarY = SectionModule.getXY(origin[0], origin[1], ConcreteX, ConcreteY, RebarX, RebarY)
+    return ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, RebarDiam, ConcreteMat, RebarMat
+
+
+# Функция возвращает модули упругости и диаграммы материалов
+# Для сечений из нескольких материалов возвращаются списки по номерам материалов (см. MshModule.getMaterials)
+def getDiagrams(concrete, rebar, temp=20, Lambda=1, design=True, materials=None):
+    if materials is not None:
+        ConcreteMaterials, RebarMaterials = MshModule.getMaterials(materials)
+    else:
+        ConcreteMaterials, RebarMaterials = [concrete], [rebar]
+    Eb = [c.Eb for c in ConcreteMaterials]
+    Es = [r.Es for r in RebarMaterials]
+    sigmab_func = []
+    for c in ConcreteMaterials:
+        diagram = ConcreteModule.KarpenkoTemp(c, temp, Lambda)
+        sigmab_func.append(diagram.Design() if design else diagram.Normative())
+    sigmas_func = []
+    for r in RebarMaterials:
+        diagram = RebarModule.Rebar2L(r)
+        sigmas_func.append(diagram.Design() if design else diagram.Normative())
+    if materials is None:
+        return Eb[0], sigmab_func[0], Es[0], sigmas_func[0]
+    return Eb, sigmab_func, Es, sigmas_func
+
+
+# Функция возвращает класс материала по имени из модуля module
+def _materialClass(module, cls, name):
+    value = getattr(module, name, None)
+    if not isinstance(value, cls):
+        raise ValueError("Unknown material class: " + name)
+    return value
+
+
+# Функция пакетного расчета: загружения рассчитываются частями по chunkSize исполнителем executor,
+# результаты каждой части сразу записываются в results.csv (и results.h5) и сводятся к огибающим, поэтому
+# объем памяти не зависит от числа загружений. Возвращает словарь сводки расчета (записывается в summary.json)
+def runBatch(section, loads, output, concrete=ConcreteModule.B25, rebar=RebarModule.A400, origin=None, materials=None,
+             temp=20, Lambda=1, design=True, scale=1.0, deltaMN=0.001, executor="serial", workers=None, chunkSize=1000,
+             hdf5=False, **kwargs):
+    start = time.perf_counter()
+    names, Nz, Mx, My = readLoads(loads, scale)
+    ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, RebarDiam, ConcreteMat, RebarMat = \
+        loadSection(section, origin, materials)
+    Eb, sigmab_func, Es, sigmas_func = getDiagrams(concrete, rebar, temp, Lambda, design, materials)
+    solve = getExecutor(executor)
+    os.makedirs(output, exist_ok=True)
+
+    envelope = EnvelopeModule.Envelope(len(ConcreteX), len(RebarX))
+    writer = None
+    if hdf5:
+        writer = ExportModule.ResultWriter(os.path.join(output, "results.h5"), ConcreteX, ConcreteY, ConcreteArea,
+                                           RebarX, RebarY, RebarArea, RebarDiam, ConcreteMat, RebarMat)
+    nCases = len(Nz)
+    failed = []
+    iterations = 0
+    columns = ["case", "Nz", "Mx", "My", "converged", "iterations", "message", "epsbMin", "epsbMax", "sigmabMin",
+               "epsSMin", "epsSMax", "sigmaSMin", "sigmaSMax"]
+    try:
+        with open(os.path.join(output, "results.csv"), "w", newline="") as f:
+            table = csv.writer(f)
+            table.writerow(columns)
+            for s in range(0, nCases, chunkSize):
+                part = slice(s, min(s + chunkSize, nCases))
+                sigmab, epsb, sigmaS, epsS, status = solve(Nz[part], Mx[part], My[part], Eb, sigmab_func, Es, sigmas_func,
+                                                           ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                                                           deltaMN, workers=workers, ConcreteMat=ConcreteMat,
+                                                           RebarMat=RebarMat, **kwargs)
+                envelope.Update(np.arange(part.start, part.stop), sigmab, epsb, sigmaS, epsS, status.converged)
+                if writer is not None:
+                    writer.Append(sigmab, epsb, sigmaS, epsS, np.column_stack([Nz[part], Mx[part], My[part]]), status)
+                iterations += int(np.sum(status.iterations))
+                extremes = [e for a in (epsb, sigmab, epsS, sigmaS) for e in EnvelopeModule.getExtremes(a)]
+                for k, i in enumerate(range(part.start, part.stop)):
+                    if not status.converged[k]:
+                        failed.append({"case": names[i], "message": str(status.message[k])})
+                    table.writerow([names[i], Nz[i], Mx[i], My[i], bool(status.converged[k]),
+                                    int(status.iterations[k]), status.message[k],
+                                    extremes[0][k], extremes[1][k], extremes[2][k],
+                                    extremes[4][k], extremes[5][k], extremes[6][k], extremes[7][k]])
+    finally:
+        if writer is not None:
+            writer.Close()
+
+    summary = {
+        "section": section,
+        "loads": loads,
+        "executor": executor,
+        "fibres": {"concrete": len(ConcreteX), "rebar": len(RebarX)},
+        "cases": nCases,
+        "converged": nCases - len(failed),
+        "failed": failed,
+        "iterations": iterations,
+        "time": time.perf_counter() - start,
+        "envelope": {},
+    }
+    for field in EnvelopeModule.FIELDS:
+        if len(envelope.max[field]) == 0 or envelope.cases == 0:
+            continue
+        i, j = int(np.argmin(envelope.min[field])), int(np.argmax(envelope.max[field]))
+        summary["envelope"][field] = {
+            "min": float(envelope.min[field][i]), "minCase": names[envelope.argmin[field][i]], "minFibre": i,
+            "max": float(envelope.max[field][j]), "maxCase": names[envelope.argmax[field][j]], "maxFibre": j,
+        }
+    with open(os.path.join(output, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless batch NDM analysis of a cross-section")
+    parser.add_argument("section", help="mesh file (.msh) or parametric section 'type:key=value,...'")
+    parser.add_argument("--loads", required=True, help="CSV or Parquet file with columns Nz, Mx, My [, case]")
+    parser.add_argument("--output", default="results", help="output directory")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor applied to loads (e.g. 0.001 for kN)")
+    parser.add_argument("--origin", type=float, nargs=2, metavar=("X", "Y"), help="reference point of coordinates")
+    parser.add_argument("--concrete", default="B25", help="concrete class (ConcreteModule)")
+    parser.add_argument("--rebar", default="A400", help="rebar class (RebarModule)")
+    parser.add_argument("--material", action="append", default=[], metavar="GROUP=CLASS",
+                        help="material of a physical group for multi-material meshes (repeatable)")
+    parser.add_argument("--temp", type=float, default=20, help="concrete temperature, C")
+    parser.add_argument("--Lambda", type=float, default=1)
+    parser.add_argument("--normative", action="store_true", help="use normative instead of design diagrams")
+    parser.add_argument("--deltaMN", type=float, default=0.001)
+    parser.add_argument("--method", default="secant", choices=("secant", "newton"))
+    parser.add_argument("--backend", default="numpy", choices=("numpy", "numba"))
+    parser.add_argument("--maxIter", type=int, default=500)
+    parser.add_argument("--executor", default="serial", help="serial, parallel, batch, sequence or module:function")
+    parser.add_argument("--workers", type=int, default=None, help="processes for the parallel executor")
+    parser.add_argument("--chunk", type=int, default=1000, help="load cases solved and written per chunk")
+    parser.add_argument("--hdf5", action="store_true", help="write fibre results to results.h5/.xdmf")
+    args = parser.parse_args(argv)
+    if args.executor == "batch" and (args.method != "secant" or args.backend != "numpy"):
+        parser.error("--executor batch supports only --method secant and --backend numpy")
+
+    materials = None
+    if args.material:
+        materials = {}
+        for item in args.material:
+            group, name = item.split("=")
+            if hasattr(ConcreteModule, name) and isinstance(getattr(ConcreteModule, name), ConcreteModule.ConcreteClass):
+                materials[group] = getattr(ConcreteModule, name)
+            else:
+                materials[group] = _materialClass(RebarModule, RebarModule.RebarClass, name)
+    summary = runBatch(args.section, args.loads, args.output,
+                       concrete=_materialClass(ConcreteModule, ConcreteModule.ConcreteClass, args.concrete),
+                       rebar=_materialClass(RebarModule, RebarModule.RebarClass, args.rebar),
+                       origin=args.origin, materials=materials, temp=args.temp, Lambda=args.Lambda,
+                       design=not args.normative, scale=args.scale, deltaMN=args.deltaMN, executor=args.executor,
+                       workers=args.workers, chunkSize=args.chunk, hdf5=args.hdf5, method=args.method,
+                       backend=args.backend, maxIter=args.maxIter)
+    print("%s: %d/%d load cases converged, %.2f s" % (args.section, summary["converged"], summary["cases"], summary["time"]))
+    return 0 if summary["converged"] == summary["cases"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import argparse
+import json
+import os
+import platform
+import time
+import numpy as np
+import ConcreteModule
+import RebarModule
+import MshModule
+import ParametricModule
+import NdmModule
+import CapacityModule
+import KernelModule
+
+
+# Набор тестов производительности: импорт сечений, построение диаграмм, одиночные расчеты НДМ
+# и пакеты загружений. Запуск: python Benchmark.py [--output results.json] [--quick]
+# Результаты сохраняются в JSON для сравнения между запусками
+
+
+# Функция возвращает лучшее время выполнения func из repeat запусков, с
+def timeit(func, repeat):
+    best = np.inf
+    for i in range(repeat):
+        t = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+# Синтетические сечения примерно из n волокон: прямоугольное, тавровое и круглое
+# Возвращают (ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea)
+def rectangle(n, b=0.4, h=0.6):
+    info = ParametricModule.rectangleSection(b, h, 0.05, 0.025, size=np.sqrt(b * h / n))
+    return info[1], info[2], info[3], info[7], info[8], info[6]
+
+
+def tee(n, bf=0.8, hf=0.15, bw=0.3, h=0.65):
+    info = ParametricModule.teeSection(bf, hf, bw, h, 0.05, 0.025, 3, size=np.sqrt((bf * hf + bw * (h - hf)) / n))
+    return info[1], info[2], info[3], info[7], info[8], info[6]
+
+
+def circle(n, D=0.5):
+    info = ParametricModule.circleSection(D, 0.05, 0.025, 8, size=np.sqrt(np.pi * D**2 / 4 / n))
+    return info[1], info[2], info[3], info[7], info[8], info[6]
+
+
+# Функция возвращает пакет загружений в пределах несущей способности сечения
+# Загружения строятся по nDirections направлениям (продольная сила и моменты относительно центра тяжести бетона,
+# пересчитанные к началу координат сечения). Для каждого направления несущая способность определяется функцией
+# CapacityModule.Capacity по сечению reference (по умолчанию - section), загружение равно случайной доле 0.3-0.8
+# предельного. Возвращает Nz, Mx, My и коэффициенты несущей способности направлений
+def loads(section, nCases, Rb, Eb, sigmab_func, Es, sigmas_func, deltaMN, reference=None, nDirections=8, seed=0):
+    ConcreteX, ConcreteY, ConcreteArea = section[:3]
+    A = ConcreteArea.sum()
+    xc = np.dot(ConcreteArea, ConcreteX) / A
+    yc = np.dot(ConcreteArea, ConcreteY) / A
+    N0 = A * Rb
+    b = np.ptp(ConcreteX)
+    h = np.ptp(ConcreteY)
+    rng = np.random.default_rng(seed)
+    # Моменты Mx = sum(sigma*A*x), My = sum(sigma*A*y) относительно центра тяжести и их перенос к началу координат
+    Nd = -rng.uniform(0.05, 0.5, nDirections) * N0
+    Mxd = rng.uniform(-0.05, 0.05, nDirections) * N0 * b + Nd * xc
+    Myd = rng.uniform(-0.05, 0.05, nDirections) * N0 * h + Nd * yc
+    if reference is None:
+        reference = section
+    factors = np.array([CapacityModule.Capacity(Nd[d], Mxd[d], Myd[d], Eb, sigmab_func, Es, sigmas_func, *reference,
+                                                deltaMN, tol=0.01).factor for d in range(nDirections)])
+    d = rng.integers(0, nDirections, nCases)
+    scale = rng.uniform(0.3, 0.8, nCases) * factors[d]
+    return Nd[d] * scale, Mxd[d] * scale, Myd[d] * scale, factors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NDM performance benchmark")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file for results")
+    parser.add_argument("--quick", action="store_true", help="skip 100k-fiber sections and use fewer repeats")
+    parser.add_argument("--cases", type=int, default=10000, help="number of load cases in batch tests")
+    parser.add_argument("--largeCases", type=int, default=500,
+                        help="number of load cases in NDMBatch and NDM loop tests on large sections")
+    args = parser.parse_args()
+
+    repeat = 1 if args.quick else 3
+    sizes = [1000, 10000] if args.quick else [1000, 10000, 100000]
+    ConcreteMaterial = ConcreteModule.B25
+    RebarMaterial = RebarModule.A400
+    Eb = ConcreteMaterial.Eb
+    Es = RebarMaterial.Es
+    deltaMN = 0.001
+    results = []
+
+    def record(name, seconds, **info):
+        results.append(dict(name=name, seconds=seconds, **info))
+        print("%-40s %10.4f s  %s" % (name, seconds, info))
+
+    # Построение диаграмм деформирования
+    record("KarpenkoTemp.Design", timeit(lambda: ConcreteModule.KarpenkoTemp(ConcreteMaterial, 20, 1).Design(), repeat * 10))
+    record("Rebar2L.Design", timeit(lambda: RebarModule.Rebar2L(RebarMaterial).Design(), repeat * 10))
+    sigmab_func = ConcreteModule.KarpenkoTemp(ConcreteMaterial, 20, 1).Design()
+    sigmas_func = RebarModule.Rebar2L(RebarMaterial).Design()
+
+    # Сечения: синтетические и из файлов примеров
+    record("ParametricModule.rectangleSection 1k", timeit(lambda: rectangle(1000), repeat * 10))
+    sections = {}
+    # Несущая способность крупных сечений определяется по тому же сечению из 10 тыс. волокон
+    references = {}
+    for n in sizes:
+        for name, builder in (("rectangle", rectangle), ("tee", tee), ("circle", circle)):
+            sections["%s_%dk" % (name, n // 1000)] = builder(n)
+            if n > 10000:
+                references["%s_%dk" % (name, n // 1000)] = builder(10000)
+    # Импорт через gmsh выполняется, только если gmsh установлен
+    try:
+        import gmsh
+        import SectionModule
+    except (ImportError, OSError):
+        gmsh = None
+    for name, X, Y in (("Primer10SP52.msh", -0.04, 0.06), ("Primer40SP52.msh", -0.3, 0.2)):
+        file = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+        record("MshModule.getSectionInfo " + name, timeit(lambda: MshModule.getSectionInfo(file), repeat))
+        if gmsh is not None:
+            def gmshImport():
+                SectionModule.getSectionInfo(file)
+                gmsh.finalize()
+            record("SectionModule.getSectionInfo " + name, timeit(gmshImport, repeat))
+        info = MshModule.getSectionInfo(file)
+        ConcreteX, ConcreteY = -(X - info[1]), -(Y - info[2])
+        RebarX, RebarY = -(X - info[7]), -(Y - info[8])
+        sections[name] = (ConcreteX, ConcreteY, info[3], RebarX, RebarY, info[6])
+
+    # Одиночные расчеты и пакеты загружений
+    for name, section in sections.items():
+        Nz, Mx, My, factors = loads(section, args.cases, ConcreteMaterial.Rb, Eb, sigmab_func, Es, sigmas_func, deltaMN,
+                                    references.get(name))
+        fibers = len(section[0]) + len(section[3])
+        # Признак сходимости записывается вместе со временем, чтобы замеры относились к сошедшимся расчетам
+        for method in ("secant", "newton"):
+            solve = lambda: NdmModule.NDM(Nz[0], Mx[0], My[0], Eb, sigmab_func, Es, sigmas_func, *section, deltaMN,
+                                          method=method, fullOutput=True)
+            record("NDM %s %s" % (method, name), timeit(solve, repeat), fibers=fibers,
+                   converged=bool(solve()[4].converged))
+        if KernelModule.AVAILABLE:
+            # Первый вызов включает загрузку (компиляцию) ядра и в замер не входит
+            solve = lambda: NdmModule.NDM(Nz[0], Mx[0], My[0], Eb, sigmab_func, Es, sigmas_func, *section, deltaMN,
+                                          backend="numba", fullOutput=True)
+            converged = bool(solve()[4].converged)
+            record("NDM numba %s" % name, timeit(solve, repeat), fibers=fibers, converged=converged)
+        # Крупные сечения: пакет загружений NDMBatch в сравнении с циклом расчетов NDM с общим NDMSection
+        # (для сечений более 20 тыс. волокон число загружений уменьшается, чтобы ограничить объем результатов)
+        if len(section[0]) > 5000:
+            cases = args.largeCases if len(section[0]) <= 20000 else max(args.largeCases // 5, 1)
+            ndmSection = NdmModule.NDMSection(*section)
+            converged = []
+            def loop():
+                converged.clear()
+                for k in range(cases):
+                    status = NdmModule.NDM(Nz[k], Mx[k], My[k], Eb, sigmab_func, Es, sigmas_func, *section, deltaMN,
+                                           fullOutput=True, section=ndmSection)[4]
+                    converged.append(bool(status.converged))
+            seconds = timeit(loop, 1)
+            record("NDM loop %d cases %s" % (cases, name), seconds, fibers=fibers, cases=cases, converged=sum(converged))
+            def largeBatch():
+                converged.clear()
+                status = NdmModule.NDMBatch(Nz[:cases], Mx[:cases], My[:cases], Eb, sigmab_func, Es, sigmas_func,
+                                            *section, deltaMN, fullOutput=True, section=ndmSection)[4]
+                converged.append(int(np.count_nonzero(status.converged)))
+            seconds = timeit(largeBatch, 1)
+            record("NDMBatch %d cases %s" % (cases, name), seconds, fibers=fibers, cases=cases, converged=sum(converged))
+        if len(section[0]) > 20000:
+            continue
+        # Пакет загружений решается частями, чтобы ограничить объем памяти (загружения x волокна)
+        converged = []
+        def batch():
+            converged.clear()
+            for k in range(0, args.cases, 1000):
+                status = NdmModule.NDMBatch(Nz[k:k + 1000], Mx[k:k + 1000], My[k:k + 1000], Eb, sigmab_func, Es,
+                                            sigmas_func, *section, deltaMN, fullOutput=True)[4]
+                converged.append(int(np.count_nonzero(status.converged)))
+        seconds = timeit(batch, 1)
+        record("NDMBatch %d cases %s" % (args.cases, name), seconds, fibers=fibers, cases=args.cases,
+               converged=sum(converged), capacity=[round(float(f), 4) for f in factors])
+
+    data = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import numpy as np
+from NdmModule import NDM, NDMSection, getMaterialCount
+
+
+# Класс для хранения результата поиска несущей способности
+class CapacityResult:
+    def __init__(self, factor, ratio, governing, fibre, strain, limit, mode, message, trials, iterations,
+                 sigmab, epsb, sigmaS, epsS):
+        self.factor = factor  # Коэффициент нагрузки, при котором достигается несущая способность
+        self.utilization = 1 / factor if factor > 0 else np.inf  # Коэффициент использования (1 / factor)
+        self.ratio = ratio  # Отношение деформации определяющего волокна к предельной при коэффициенте factor
+        self.governing = governing  # Определяющий материал: "concrete" или "rebar"
+        self.fibre = fibre  # Номер определяющего волокна бетона или стержня арматуры
+        self.strain = strain  # Деформация определяющего волокна при коэффициенте factor
+        self.limit = limit  # Предельная деформация определяющего волокна
+        self.mode = mode  # "strain" - достижение предельной деформации, "equilibrium" - потеря равновесия (нет решения)
+        self.message = message  # "capacity", "factorMax" (не достигнута до factorMax) или "factorMin"
+        self.trials = trials  # Количество расчетов НДМ
+        self.iterations = iterations  # Суммарное количество итераций
+        self.sigmab = sigmab  # Напряжения и деформации волокон при коэффициенте factor
+        self.epsb = epsb
+        self.sigmaS = sigmaS
+        self.epsS = epsS
+
+
+# Функция возвращает отношения деформаций волокон к предельным: наибольшее отношение, материал, номер волокна,
+# деформацию и предельную деформацию. Бетон проверяется по сжатию (epsbu < 0), арматура - по модулю деформации
+def _strainRatio(epsb, epsS, epsbu, epssu):
+    rb = epsb / epsbu if len(epsb) else np.zeros(1)
+    rs = np.abs(epsS) / epssu if len(epsS) else np.zeros(1)
+    i, j = int(np.argmax(rb)), int(np.argmax(rs))
+    if len(epsS) == 0 or (len(epsb) and rb[i] >= rs[j]):
+        return float(rb[i]), "concrete", i, float(epsb[i]), epsbu
+    return float(rs[j]), "rebar", j, float(epsS[j]), epssu
+
+
+# Функция поиска несущей способности сечения при пропорциональном увеличении усилий Nz, Mx, My
+# Коэффициент нагрузки сначала заключается в интервал (увеличением или уменьшением в growth раз, начиная с 1),
+# затем уточняется делением интервала пополам до относительной точности tol. Коэффициент допустим, если расчет НДМ
+# сходится и деформации волокон не превышают предельных: epsbu - для сжатого бетона, epssu - для арматуры.
+# Каждый расчет начинается с состояния решателя при наибольшем допустимом коэффициенте. Расчеты за пределом несущей
+# способности прекращаются досрочно: при деформациях более strainFactor предельных или после trialIter итераций.
+# Параметры kwargs (method, backend и др.) передаются в функцию NDM
+def Capacity(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+             deltaMN, epsbu=-0.0035, epssu=0.025, tol=1e-3, growth=2.0, factorMin=1e-4, factorMax=1e3, strainFactor=5.0,
+             trialIter=100, section=None, ConcreteMat=None, RebarMat=None, **kwargs):
+    if Nz == 0 and Mx == 0 and My == 0:
+        raise ValueError("Capacity search requires a nonzero load")
+    if section is None:
+        section = NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat,
+                             getMaterialCount(sigmab_func), getMaterialCount(sigmas_func))
+    epsLimit = strainFactor * max(abs(epsbu), abs(epssu))
+    count = [0, 0]
+
+    # Расчет при коэффициенте k; возвращает признак допустимости, отношение деформаций и результаты расчета
+    def trial(k, state):
+        sigmab, epsb, sigmaS, epsS, status = NDM(k * Nz, k * Mx, k * My, Eb, sigmab_func, Es, sigmas_func,
+                                                 None, None, None, None, None, None, deltaMN, maxIter=trialIter,
+                                                 epsLimit=epsLimit, fullOutput=True, section=section, state=state, **kwargs)
+        count[0] += 1
+        count[1] += status.iterations
+        ratio = _strainRatio(epsb, epsS, epsbu, epssu)
+        return bool(status.converged) and ratio[0] <= 1, (ratio, status, sigmab, epsb, sigmaS, epsS)
+
+    # Заключение коэффициента в интервал [lo, hi]: lo - допустимый коэффициент, hi - недопустимый
+    lo, hi = 0.0, None
+    best = None
+    k = 1.0
+    ok, result = trial(k, None)
+    if ok:
+        while ok:
+            lo, best = k, result
+            if k >= factorMax:
+                break
+            k = min(k * growth, factorMax)
+            ok, result = trial(k, best[1].state)
+        if ok:
+            hi = None
+        else:
+            hi, last = k, result
+    else:
+        hi, last = k, result
+        while not ok and k > factorMin:
+            k /= growth
+            ok, result = trial(k, None)
+            if not ok:
+                hi, last = k, result
+        if ok:
+            lo, best = k, result
+
+    # Уточнение делением интервала пополам
+    if best is not None and hi is not None:
+        while hi - lo > tol * hi:
+            k = 0.5 * (lo + hi)
+            ok, result = trial(k, best[1].state)
+            if ok:
+                lo, best = k, result
+            else:
+                hi, last = k, result
+
+    if best is None:
+        message = "factorMin"
+        ratio, status, sigmab, epsb, sigmaS, epsS = last
+    else:
+        message = "capacity" if hi is not None else "factorMax"
+        ratio, status, sigmab, epsb, sigmaS, epsS = best
+    # Несущая способность определяется деформациями, если за границей интервала получено решение
+    mode = "strain" if hi is None or (last[1].converged and last[0][0] > 1) else "equilibrium"
+    value, governing, fibre, strain, limit = ratio
+    return CapacityResult(lo, value, governing, fibre, strain, limit, mode, message, count[0], count[1],
+                          sigmab, epsb, sigmaS, epsS)
@@ -1,5 +1,6 @@
+from collections import OrderedDict
 import numpy as np
-from scipy import interpolate
+import DiagramModule
 
 # Класс для задания физико-механических характеристик бетона
 class ConcreteClass:
@@ -11,215 +12,134 @@ class ConcreteClass:
         self.Rb = Rb
         self.Rbt = Rbt
 
+# Количество участков для вычисления напряжений на каждой ветви диаграммы
+NUM = 50
+# Кэш построенных диаграмм: (B, Eb, R, Rt, temp, Lambda) -> DiagramModule.Diagram
+# При превышении CACHE_SIZE удаляются давно не использовавшиеся диаграммы (LRU)
+CACHE_SIZE = 1024
+_DIAGRAMS = OrderedDict()
+
+
+# Функция вычисляет ветвь диаграммы Карпенко для массива вершин (по строкам)
+# Напряжения изменяются от start * sigma1 до stop * sigma1; знак sign = -1 для нисходящей ветви
+def _branch(sigma1, nu1, nu0, omega1, start, stop, sign):
+    sigma = np.linspace(sigma1 * start, sigma1 * stop, NUM, dtype=float, axis=-1)
+    # Вычисляем уровень напряжений
+    eta = sigma / sigma1[:, None]
+    # Вычисляем коэффициент секущего модуля
+    nu0 = np.broadcast_to(nu0, sigma1.shape)[:, None]
+    omega1 = omega1[:, None]
+    nu1 = nu1[:, None]
+    nu = nu1 + sign * (nu0 - nu1) * (1 - omega1 * eta - (1 - omega1) * eta**2)**0.5
+    return sigma, nu
+
+
+# Функция вычисляет точки диаграмм Карпенко сразу для массивов температур temp и параметров Lambda
+# R, Rt - прочность бетона на сжатие и растяжение (нормативная или расчетная)
+# Возвращает массивы деформаций и напряжений (диаграммы x точки)
+def _karpenkoPoints(B, Eb, R, Rt, temp, Lambda):
+    temp, Lambda = np.broadcast_arrays(np.atleast_1d(np.asarray(temp, dtype=float)), np.asarray(Lambda, dtype=float))
+
+    beta_temp_E = 1 + 0.2 * (20 - temp) / 90  # Коэффициент изменения модуля упругости бетона при воздействии низких отрицательных температур
+    beta_temp_R = 1 + 0.6 * (20 - temp) / 90  # Коэффициент увеличения прочности бетона в вершине диаграммы в зависимости от величины отрицательной температуры t
+    beta_temp_eps = 1 + 0.55 * (20- temp) / 90  # Коэффициент изменения деформаций в вершине диаграммы сжатия
+    beta_temp_Rt = 1 + 1.3 * (20 - temp) / 90  # Коэффициент увеличения прочности бетона в вершине диаграммы при центральном растяжении
+
+    # Деформации в вершине диаграммы работы бетона при temp = +20
+    eps1_b = -B/Eb * Lambda * (1 + (0.8-0.15*B**2/1e4) * Lambda*B/60+0.2*Lambda/B) / (0.12+1.03*B/60+0.2/B)
+
+    sigma1_b_temp = -R * beta_temp_R  # Напряжения в вершине диаграммы сжатия при заданной температуре
+    nu1_b = sigma1_b_temp / (eps1_b * beta_temp_eps * Eb * beta_temp_E)  # Коэффициент секущего модуля в вершине диаграммы сжатия
+
+    sigma1_bt_temp = Rt * beta_temp_Rt  # Напряжения в вершине диаграммы растяжения при заданной температуре
+    nu1_bt = 0.6 + 0.15 * sigma1_bt_temp / 2.5  # Коэффициент секущего модуля в вершине диаграммы растяжения
+
+    # Ветви диаграммы в порядке следования: нисходящая и восходящая ветви сжатия, восходящая и нисходящая
+    # ветви растяжения; первая точка каждой следующей ветви совпадает с последней точкой предыдущей
+    branches = [
+        _branch(sigma1_b_temp, nu1_b, 2.05 * nu1_b, 1.95 * nu1_b - 0.138, 0.2, 1, -1),
+        _branch(sigma1_b_temp, nu1_b, 1, 2 - 2.5 * nu1_b, 1, 0, 1),
+        _branch(sigma1_bt_temp, nu1_bt, 1, 2 - 2.5 * nu1_bt, 0, 1, 1),
+        _branch(sigma1_bt_temp, nu1_bt, 2.05 * nu1_bt, 1.95 * nu1_bt - 0.138, 1, 0.1, -1),
+    ]
+    sigmab = np.hstack([branches[0][0]] + [b[0][:, 1:] for b in branches[1:]])
+    nub = np.hstack([branches[0][1]] + [b[1][:, 1:] for b in branches[1:]])
+
+    # Вычисляем относительные деформации
+    epsb = sigmab / (Eb * beta_temp_E[:, None] * nub)
+    return epsb, sigmab
+
+
+# Функция возвращает диаграммы Карпенко для массива температур temps (и/или параметров Lambda)
+# Диаграммы, отсутствующие в кэше, вычисляются одним векторизованным расчетом
+# design = True - по расчетным, False - по нормативным характеристикам бетона
+def getKarpenkoFamily(ConcreteClass, temps, Lambda, design=True):
+    B = ConcreteClass.B
+    Eb = ConcreteClass.Eb
+    R = ConcreteClass.Rb if design else ConcreteClass.Rbn
+    Rt = ConcreteClass.Rbt if design else ConcreteClass.Rbtn
+    temps, Lambda = np.broadcast_arrays(np.atleast_1d(np.asarray(temps, dtype=float)), np.asarray(Lambda, dtype=float))
+    keys = [(B, Eb, R, Rt, float(t), float(l)) for t, l in zip(temps, Lambda)]
+    found = {}
+    for k in dict.fromkeys(keys):
+        if k in _DIAGRAMS:
+            _DIAGRAMS.move_to_end(k)
+            found[k] = _DIAGRAMS[k]
+    missing = [k for k in dict.fromkeys(keys) if k not in found]
+    if missing:
+        epsb, sigmab = _karpenkoPoints(B, Eb, R, Rt, [k[4] for k in missing], [k[5] for k in missing])
+        for k, e, s in zip(missing, epsb, sigmab):
+            found[k] = _DIAGRAMS[k] = DiagramModule.Diagram(e, s)
+        while len(_DIAGRAMS) > CACHE_SIZE:
+            _DIAGRAMS.popitem(last=False)
+    return [found[k] for k in keys]
+
+
 # Класс для получения диаграммы деформирования бетона по Карпенко с учетом температуры
 class KarpenkoTemp:
     def __init__(self, ConcreteClass, temp, Lambda):
         self.ConcreteClass = ConcreteClass
         self.temp = temp
         self.Lambda = Lambda
-    
+
+    # Метод для расчета диаграммы по нормативным характеристикам бетона
+    def Normative(self):
+        return getKarpenkoFamily(self.ConcreteClass, self.temp, self.Lambda, design=False)[0]
+
+    # Метод для расчета диаграммы по расчетным характеристикам бетона
+    def Design(self):
+        return getKarpenkoFamily(self.ConcreteClass, self.temp, self.Lambda, design=True)[0]
+
+
+# Класс для получения диаграммы деформирования бетона по Карпенко при неравномерной температуре по сечению
+# temp - массив температур волокон бетона (см. getLinearTemperature), step - шаг таблицы температур, °C
+# Диаграммы строятся для температур таблицы от минимальной до максимальной температуры волокон,
+# напряжения в волокнах вычисляются по таблице (температура x деформации) за один проход
+class KarpenkoThermal:
+    def __init__(self, ConcreteClass, temp, Lambda, step=5.0):
+        self.ConcreteClass = ConcreteClass
+        self.temp = np.asarray(temp, dtype=float)
+        self.Lambda = Lambda
+        tmin = self.temp.min()
+        tmax = self.temp.max()
+        self.temps = np.linspace(tmin, tmax, max(int(np.ceil((tmax - tmin) / step)), 0) + 1)  # Температуры таблицы
+
     # Метод для расчета диаграммы по нормативным характеристикам бетона
     def Normative(self):
-        B = self.ConcreteClass.B
-        Eb = self.ConcreteClass.Eb
-        Rbn = self.ConcreteClass.Rbn
-        Rbtn = self.ConcreteClass.Rbtn
-        temp = self.temp
-        Lambda = self.Lambda
-
-        beta_temp_E = 1 + 0.2 * (20 - temp) / 90  # Коэффициент изменения модуля упругости бетона при воздействии низких отрицательных температур
-        beta_temp_R = 1 + 0.6 * (20 - temp) / 90  # Коэффициент увеличения прочности бетона в вершине диаграммы в зависимости от величины отрицательной температуры t
-        beta_temp_eps = 1 + 0.55 * (20- temp) / 90  # Коэффициент изменения деформаций в вершине диаграммы сжатия
-        beta_temp_Rt = 1 + 1.3 * (20 - temp) / 90  # Коэффициент увеличения прочности бетона в вершине диаграммы при центральном растяжении
-
-        # Деформации в вершине диаграммы работы бетона при temp = +20
-        eps1_b = -B/Eb * Lambda * (1 + (0.8-0.15*B**2/1e4) * Lambda*B/60+0.2*Lambda/B) / (0.12+1.03*B/60+0.2/B)
-
-        sigma1_b_temp = -Rbn * beta_temp_R  # Напряжения в вершине диаграммы сжатия при заданной температуре
-        nu1_b = sigma1_b_temp / (eps1_b * beta_temp_eps * Eb * beta_temp_E)  # Коэффициент секущего модуля в вершине диаграммы сжатия
-
-        sigma1_bt_temp = Rbtn * beta_temp_Rt  # Напряжения в вершине диаграммы растяжения при заданной температуре
-        nu1_bt = 0.6 + 0.15 * sigma1_bt_temp / 2.5  # Коэффициент секущего модуля в вершине диаграммы растяжения
-
-        # Нисходящая ветвь сжатия
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab = np.linspace(sigma1_b_temp * 0.2, sigma1_b_temp, NUM, dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab))
-        for i in range(len(sigmab)):
-            eta[i] = sigmab[i] / sigma1_b_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 2.05 * nu1_b
-        omega1 = 1.95 * nu1_b - 0.138
-        nub = np.zeros(len(sigmab))
-        for i in range(len(sigmab)):
-            nub[i] = nu1_b - (nu0 - nu1_b) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Восходящая ветвь сжатия
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab1 = np.linspace(sigma1_b_temp, 0, NUM,dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            eta[i] = sigmab1[i] / sigma1_b_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 1
-        omega1 = 2 - 2.5 * nu1_b
-        nub1 = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            nub1[i] = nu1_b + (nu0 - nu1_b) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Объединяем восходящую и нисходящую ветвь сжатия
-        sigmab = np.hstack([sigmab, np.delete(sigmab1, 0)])
-        nub = np.hstack([nub, np.delete(nub1, 0)])
-
-        # Восходящая ветвь растяжения
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab1 = np.linspace(0, sigma1_bt_temp, NUM, dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            eta[i] = sigmab1[i] / sigma1_bt_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 1
-        omega1 = 2 - 2.5 * nu1_bt
-        nub1 = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            nub1[i] = nu1_bt + (nu0 - nu1_bt) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Объединяем массивы
-        sigmab = np.hstack([sigmab, np.delete(sigmab1, 0)])
-        nub = np.hstack([nub, np.delete(nub1, 0)])
-
-        # Нисходящая ветвь растяжения
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab1 = np.linspace(sigma1_bt_temp, sigma1_bt_temp * 0.1, NUM, dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            eta[i] = sigmab1[i] / sigma1_bt_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 2.05 * nu1_bt
-        omega1 = 1.95 * nu1_bt - 0.138
-        nub1 = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            nub1[i] = nu1_bt - (nu0 - nu1_bt) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Объединяем массивы
-        sigmab = np.hstack([sigmab, np.delete(sigmab1, 0)])
-        nub = np.hstack([nub, np.delete(nub1, 0)])
-
-        # Вычисляем относительные деформации
-        epsb = np.zeros(len(sigmab))
-        for i in range(len(sigmab)):
-            epsb[i] = sigmab[i] / (Eb * beta_temp_E * nub[i])
-
-        sigmab_func = interpolate.interp1d(epsb, sigmab, kind = "linear", fill_value='extrapolate')
-        epsb_func = interpolate.interp1d(sigmab, epsb, kind = "linear", fill_value='extrapolate')
-
-        return sigmab_func
+        diagrams = getKarpenkoFamily(self.ConcreteClass, self.temps, self.Lambda, design=False)
+        return DiagramModule.ThermalDiagram(DiagramModule.DiagramTable(self.temps, diagrams), self.temp)
 
     # Метод для расчета диаграммы по расчетным характеристикам бетона
     def Design(self):
-        B = self.ConcreteClass.B
-        Eb = self.ConcreteClass.Eb
-        Rb = self.ConcreteClass.Rb
-        Rbt = self.ConcreteClass.Rbt
-        temp = self.temp
-        Lambda = self.Lambda
-
-        beta_temp_E = 1 + 0.2 * (20 - temp) / 90  # Коэффициент изменения модуля упругости бетона при воздействии низких отрицательных температур
-        beta_temp_R = 1 + 0.6 * (20 - temp) / 90  # Коэффициент увеличения прочности бетона в вершине диаграммы в зависимости от величины отрицательной температуры t
-        beta_temp_eps = 1 + 0.55 * (20- temp) / 90  # Коэффициент изменения деформаций в вершине диаграммы сжатия
-        beta_temp_Rt = 1 + 1.3 * (20 - temp) / 90  # Коэффициент увеличения прочности бетона в вершине диаграммы при центральном растяжении
-
-        # Деформации в вершине диаграммы работы бетона при temp = +20
-        eps1_b = -B/Eb * Lambda * (1 + (0.8-0.15*B**2/1e4) * Lambda*B/60+0.2*Lambda/B) / (0.12+1.03*B/60+0.2/B)
-
-        sigma1_b_temp = -Rb * beta_temp_R  # Напряжения в вершине диаграммы сжатия при заданной температуре
-        nu1_b = sigma1_b_temp / (eps1_b * beta_temp_eps * Eb * beta_temp_E)  # Коэффициент секущего модуля в вершине диаграммы сжатия
-
-        sigma1_bt_temp = Rbt * beta_temp_Rt  # Напряжения в вершине диаграммы растяжения при заданной температуре
-        nu1_bt = 0.6 + 0.15 * sigma1_bt_temp / 2.5  # Коэффициент секущего модуля в вершине диаграммы растяжения
-
-        # Нисходящая ветвь сжатия
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab = np.linspace(sigma1_b_temp * 0.2, sigma1_b_temp, NUM, dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab))
-        for i in range(len(sigmab)):
-            eta[i] = sigmab[i] / sigma1_b_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 2.05 * nu1_b
-        omega1 = 1.95 * nu1_b - 0.138
-        nub = np.zeros(len(sigmab))
-        for i in range(len(sigmab)):
-            nub[i] = nu1_b - (nu0 - nu1_b) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Восходящая ветвь сжатия
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab1 = np.linspace(sigma1_b_temp, 0, NUM,dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            eta[i] = sigmab1[i] / sigma1_b_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 1
-        omega1 = 2 - 2.5 * nu1_b
-        nub1 = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            nub1[i] = nu1_b + (nu0 - nu1_b) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Объединяем восходящую и нисходящую ветвь сжатия
-        sigmab = np.hstack([sigmab, np.delete(sigmab1, 0)])
-        nub = np.hstack([nub, np.delete(nub1, 0)])
-
-        # Восходящая ветвь растяжения
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab1 = np.linspace(0, sigma1_bt_temp, NUM, dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            eta[i] = sigmab1[i] / sigma1_bt_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 1
-        omega1 = 2 - 2.5 * nu1_bt
-        nub1 = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            nub1[i] = nu1_bt + (nu0 - nu1_bt) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Объединяем массивы
-        sigmab = np.hstack([sigmab, np.delete(sigmab1, 0)])
-        nub = np.hstack([nub, np.delete(nub1, 0)])
-
-        # Нисходящая ветвь растяжения
-        NUM = 50  # Количество участков для вычисления напряжений
-        sigmab1 = np.linspace(sigma1_bt_temp, sigma1_bt_temp * 0.1, NUM, dtype=float)
-        # Вычисляем уровень напряжений
-        eta = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            eta[i] = sigmab1[i] / sigma1_bt_temp
-        # Вычисляем коэффициент секущего модуля
-        nu0 = 2.05 * nu1_bt
-        omega1 = 1.95 * nu1_bt - 0.138
-        nub1 = np.zeros(len(sigmab1))
-        for i in range(len(sigmab1)):
-            nub1[i] = nu1_bt - (nu0 - nu1_bt) * (1 - omega1 * eta[i] - (1 - omega1) * eta[i]**2)**0.5
-        
-        # Объединяем массивы
-        sigmab = np.hstack([sigmab, np.delete(sigmab1, 0)])
-        nub = np.hstack([nub, np.delete(nub1, 0)])
-
-        # Вычисляем относительные деформации
-        epsb = np.zeros(len(sigmab))
-        for i in range(len(sigmab)):
-            epsb[i] = sigmab[i] / (Eb * beta_temp_E * nub[i])
-
-        sigmab_func = interpolate.interp1d(epsb, sigmab, kind = "linear", fill_value='extrapolate')
-        epsb_func = interpolate.interp1d(sigmab, epsb, kind = "linear", fill_value='extrapolate')
-
-        return sigmab_func
-    
+        diagrams = getKarpenkoFamily(self.ConcreteClass, self.temps, self.Lambda, design=True)
+        return DiagramModule.ThermalDiagram(DiagramModule.DiagramTable(self.temps, diagrams), self.temp)
+
+
+# Функция возвращает температуры волокон при линейном распределении температуры по сечению
+# temp0 - температура в начале координат, gradX, gradY - градиенты температуры вдоль осей X и Y, °C/м
+def getLinearTemperature(ConcreteX, ConcreteY, temp0, gradX=0.0, gradY=0.0):
+    return temp0 + gradX * np.asarray(ConcreteX, dtype=float) + gradY * np.asarray(ConcreteY, dtype=float)
+
 
 # Задаем классы бетона
 B20 = ConcreteClass(20.0, 27500.0, 15.0, 1.35, 11.5, 0.9)
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+# Класс кусочно-линейной диаграммы деформирования материала
+# Вычисляет напряжения, секущий и касательный модули сразу для всего массива деформаций
+class Diagram:
+    def __init__(self, eps, sigma):
+        eps = np.asarray(eps, dtype=float)
+        sigma = np.asarray(sigma, dtype=float)
+        # Сортируем точки диаграммы по возрастанию деформаций
+        order = np.argsort(eps, kind="stable")
+        self.eps = eps[order]
+        self.sigma = sigma[order]
+        # Наклоны участков диаграммы (касательные модули)
+        self.slope = np.diff(self.sigma) / np.diff(self.eps)
+
+    # Метод возвращает номера участков диаграммы для заданных деформаций
+    # За пределами диаграммы используются крайние участки (линейная экстраполяция)
+    def Segment(self, eps):
+        i = np.asarray(np.searchsorted(self.eps, eps))
+        i -= 1
+        return np.clip(i, 0, len(self.slope) - 1, out=i)
+
+    # Метод возвращает напряжения, секущий и касательный модули деформаций
+    # out - необязательные массивы (sigma, Esec, Etan) для записи результата без выделения памяти
+    def Evaluate(self, eps, out=None):
+        eps = np.asarray(eps, dtype=float)
+        if out is None:
+            out = (np.empty(eps.shape), np.empty(eps.shape), np.empty(eps.shape))
+        sigma, Esec, Etan = out
+        i = self.Segment(eps)
+        np.take(self.slope, i, out=Etan)
+        np.take(self.eps, i, out=Esec)
+        np.subtract(eps, Esec, out=sigma)
+        sigma *= Etan
+        sigma += np.take(self.sigma, i, out=Esec)
+        # При нулевых деформациях секущий модуль равен касательному
+        Esec[...] = Etan
+        np.divide(sigma, eps, out=Esec, where=eps != 0)
+        return sigma, Esec, Etan
+
+    # Вызов диаграммы как функции возвращает только напряжения
+    def __call__(self, eps):
+        eps = np.asarray(eps, dtype=float)
+        i = self.Segment(eps)
+        return self.sigma[i] + self.slope[i] * (eps - self.eps[i])
+
+
+# Класс таблицы диаграмм деформирования по температуре и деформациям
+# temps - температуры, для которых заданы диаграммы diagrams (объекты Diagram)
+# Все диаграммы пересчитываются на общую сетку деформаций (объединение точек всех диаграмм),
+# поэтому при температурах таблицы диаграммы воспроизводятся точно, а между ними напряжения
+# интерполируются линейно по температуре
+class DiagramTable:
+    def __init__(self, temps, diagrams):
+        temps = np.asarray(temps, dtype=float)
+        order = np.argsort(temps, kind="stable")
+        self.temps = temps[order]
+        self.eps = np.unique(np.concatenate([d.eps for d in diagrams]))
+        self.sigma = np.stack([diagrams[i](self.eps) for i in order])  # Напряжения (температуры x деформации)
+        self.slope = np.diff(self.sigma, axis=1) / np.diff(self.eps)
+
+    # Метод возвращает номер нижней температуры интервала таблицы и вес верхней температуры
+    # За пределами таблицы используются крайние диаграммы
+    def Weights(self, temp):
+        temp = np.asarray(temp, dtype=float)
+        if len(self.temps) == 1:
+            return np.zeros(temp.shape, dtype=np.int64), np.zeros(temp.shape)
+        k = np.clip(np.searchsorted(self.temps, temp) - 1, 0, len(self.temps) - 2)
+        w = np.clip((temp - self.temps[k]) / (self.temps[k + 1] - self.temps[k]), 0, 1)
+        return k, w
+
+    # Метод возвращает напряжения, секущий и касательный модули при температурах temp и деформациях eps
+    def Evaluate(self, temp, eps, out=None):
+        k, w = self.Weights(temp)
+        return _evaluateTable(self, k, w, np.asarray(eps, dtype=float), out)
+
+    def __call__(self, temp, eps):
+        return self.Evaluate(temp, eps)[0]
+
+
+# Класс диаграммы волокон с заданными температурами, вычисляемой по таблице DiagramTable
+# temp - температуры волокон в том порядке, в котором передаются деформации (последняя ось массива eps)
+# Интервалы температур и веса вычисляются один раз при создании, поэтому вычисление напряжений всех
+# волокон выполняется за один проход, как для обычной диаграммы Diagram
+class ThermalDiagram:
+    def __init__(self, table, temp):
+        self.table = table
+        self.temp = np.asarray(temp, dtype=float)
+        self.k, self.w = table.Weights(self.temp)
+
+    # Метод возвращает напряжения, секущий и касательный модули деформаций волокон
+    def Evaluate(self, eps, out=None):
+        return _evaluateTable(self.table, self.k, self.w, np.asarray(eps, dtype=float), out)
+
+    def __call__(self, eps):
+        return self.Evaluate(eps)[0]
+
+
+# Функция вычисляет напряжения и модули по таблице диаграмм (интерполяция по температуре и деформациям)
+# k, w - номер нижней температуры и вес верхней температуры для каждого значения eps
+def _evaluateTable(table, k, w, eps, out):
+    eps, k, w = np.broadcast_arrays(eps, k, w)
+    if out is None:
+        out = (np.empty(eps.shape), np.empty(eps.shape), np.empty(eps.shape))
+    sigma, Esec, Etan = out
+    nE = len(table.eps)
+    k1 = np.minimum(k + 1, len(table.temps) - 1)
+    # Номер участка общей сетки деформаций
+    j = np.clip(np.searchsorted(table.eps, eps) - 1, 0, nE - 2)
+    de = eps - table.eps[j]
+    s = table.sigma.ravel()
+    t = table.slope.ravel()
+    s0 = s[k * nE + j] + t[k * (nE - 1) + j] * de
+    s1 = s[k1 * nE + j] + t[k1 * (nE - 1) + j] * de
+    sigma[...] = s0 + w * (s1 - s0)
+    Etan[...] = t[k * (nE - 1) + j] * (1 - w) + t[k1 * (nE - 1) + j] * w
+    # При нулевых деформациях секущий модуль равен касательному
+    Esec[...] = Etan
+    np.divide(sigma, eps, out=Esec, where=eps != 0)
+    return sigma, Esec, Etan
@@ -0,0 +1,129 @@
+import numpy as np
+import NdmModule
+
+
+# Величины, для которых строятся огибающие: напряжения и деформации волокон бетона и арматуры
+FIELDS = ("sigmab", "epsb", "sigmaS", "epsS")
+
+
+# Функция возвращает минимальные и максимальные значения по волокнам для каждого загружения
+# a - массив (загружения x волокна) или результаты одного загружения; при отсутствии волокон (например, сечение
+# без арматуры) возвращается NaN
+def getExtremes(a):
+    a = np.atleast_2d(a)
+    if a.shape[1] == 0:
+        return np.full(len(a), np.nan), np.full(len(a), np.nan)
+    return a.min(axis=1), a.max(axis=1)
+
+
+# Класс огибающих результатов расчета по волокнам
+# Результаты загружений добавляются частями методом Update и сразу сводятся к максимальным и минимальным
+# значениям по каждому волокну с номерами определяющих загружений, поэтому объем памяти не зависит от
+# числа загружений. При topK > 0 для каждого волокна хранятся topK загружений с наибольшими по модулю
+# деформациями (epsb, epsS) в порядке убывания
+class Envelope:
+    def __init__(self, nb, ns, topK=0):
+        sizes = {"sigmab": nb, "epsb": nb, "sigmaS": ns, "epsS": ns}
+        self.max = {k: np.full(n, -np.inf) for k, n in sizes.items()}  # Максимальные значения по волокнам
+        self.min = {k: np.full(n, np.inf) for k, n in sizes.items()}  # Минимальные значения по волокнам
+        self.argmax = {k: np.full(n, -1, dtype=np.int64) for k, n in sizes.items()}  # Номера загружений максимумов
+        self.argmin = {k: np.full(n, -1, dtype=np.int64) for k, n in sizes.items()}  # Номера загружений минимумов
+        self.topK = topK
+        self.topValues = {k: np.full((topK, sizes[k]), -np.inf) for k in ("epsb", "epsS")}  # Модули деформаций
+        self.topCases = {k: np.full((topK, sizes[k]), -1, dtype=np.int64) for k in ("epsb", "epsS")}
+        self.cases = 0  # Количество учтенных загружений
+        self.skipped = 0  # Количество несошедшихся загружений, не учтенных в огибающих
+
+    # Метод добавляет результаты части загружений
+    # cases - номера загружений, массивы результатов имеют размер (загружения x волокна);
+    # converged - признаки сходимости (несошедшиеся загружения пропускаются)
+    def Update(self, cases, sigmab, epsb, sigmaS, epsS, converged=None):
+        cases = np.atleast_1d(np.asarray(cases, dtype=np.int64))
+        values = {"sigmab": sigmab, "epsb": epsb, "sigmaS": sigmaS, "epsS": epsS}
+        values = {k: np.asarray(v, dtype=float).reshape(len(cases), -1) for k, v in values.items()}
+        if converged is not None:
+            converged = np.asarray(converged, dtype=bool)
+            self.skipped += int(np.count_nonzero(~converged))
+            cases = cases[converged]
+            values = {k: v[converged] for k, v in values.items()}
+        if len(cases) == 0:
+            return
+        self.cases += len(cases)
+        for k, v in values.items():
+            if v.shape[1] == 0:
+                continue
+            fibres = np.arange(v.shape[1])
+            i = np.argmax(v, axis=0)
+            better = v[i, fibres] > self.max[k]
+            self.max[k][better] = v[i, fibres][better]
+            self.argmax[k][better] = cases[i][better]
+            i = np.argmin(v, axis=0)
+            better = v[i, fibres] < self.min[k]
+            self.min[k][better] = v[i, fibres][better]
+            self.argmin[k][better] = cases[i][better]
+        if self.topK > 0:
+            for k in ("epsb", "epsS"):
+                self._top(k, cases, np.abs(values[k]))
+
+    # Обновление topK загружений с наибольшими значениями a (загружения x волокна)
+    def _top(self, k, cases, a):
+        if a.shape[1] == 0:
+            return
+        allValues = np.vstack([self.topValues[k], a])
+        allCases = np.vstack([self.topCases[k], np.broadcast_to(cases[:, None], a.shape)])
+        K = self.topK
+        if len(allValues) > K:
+            idx = np.argpartition(-allValues, K - 1, axis=0)[:K]
+            allValues = np.take_along_axis(allValues, idx, axis=0)
+            allCases = np.take_along_axis(allCases, idx, axis=0)
+        order = np.argsort(-allValues, axis=0, kind="stable")
+        self.topValues[k] = np.take_along_axis(allValues, order, axis=0)
+        self.topCases[k] = np.take_along_axis(allCases, order, axis=0)
+
+    # Метод возвращает номер загружения и волокно с наибольшим по модулю значением величины field
+    def Governing(self, field):
+        a = np.maximum(np.abs(self.max[field]), np.abs(self.min[field]))
+        if len(a) == 0:
+            return None, None
+        i = int(np.argmax(a))
+        case = self.argmax[field][i] if abs(self.max[field][i]) >= abs(self.min[field][i]) else self.argmin[field][i]
+        return int(case), i
+
+
+# Функция расчета пакета загружений со сведением результатов к огибающим
+# Загружения рассчитываются частями по chunkSize: solver = "batch" - функцией NDMBatch, "sequence" - функцией
+# NDMSequence (с продолжением по состоянию решателя между частями). Полные массивы результатов существуют
+# только для текущей части. Возвращает Envelope и NDMStatus с массивами по загружениям;
+# параметры kwargs передаются в функцию расчета
+def NDMEnvelope(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                deltaMN, chunkSize=1000, topK=0, solver="batch", section=None, ConcreteMat=None, RebarMat=None, **kwargs):
+    Nz, Mx, My = np.broadcast_arrays(np.atleast_1d(np.asarray(Nz, dtype=float)),
+                                     np.asarray(Mx, dtype=float), np.asarray(My, dtype=float))
+    nCases = len(Nz)
+    if section is None:
+        section = NdmModule.NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat,
+                                       NdmModule.getMaterialCount(sigmab_func),
+                                       NdmModule.getMaterialCount(sigmas_func))
+    if solver not in ("batch", "sequence"):
+        raise ValueError("Unknown envelope solver: " + str(solver))
+    envelope = Envelope(section.nb, section.ns, topK)
+    converged = np.zeros(nCases, dtype=bool)
+    iterations = np.zeros(nCases, dtype=int)
+    delta = np.zeros((nCases, 3))
+    message = np.empty(nCases, dtype=object)
+    state = kwargs.pop("state", None)
+    for s in range(0, nCases, chunkSize):
+        part = slice(s, min(s + chunkSize, nCases))
+        args = (Nz[part], Mx[part], My[part], Eb, sigmab_func, Es, sigmas_func, None, None, None, None, None, None, deltaMN)
+        if solver == "batch":
+            sigmab, epsb, sigmaS, epsS, status = NdmModule.NDMBatch(*args, fullOutput=True, section=section, **kwargs)
+        else:
+            sigmab, epsb, sigmaS, epsS, status = NdmModule.NDMSequence(*args, state=state, section=section, **kwargs)
+            state = status.state
+        envelope.Update(np.arange(part.start, part.stop), sigmab, epsb, sigmaS, epsS, status.converged)
+        converged[part] = status.converged
+        iterations[part] = status.iterations
+        delta[part] = np.stack([status.deltaNz, status.deltaMx, status.deltaMy], axis=1)
+        message[part] = status.message
+    status = NdmModule.NDMStatus(converged, iterations, delta[:, 0], delta[:, 1], delta[:, 2], message, state)
+    return envelope, status
@@ -0,0 +1,153 @@
+import os
+import numpy as np
+
+# Необязательный модуль h5py: нужен только для записи результатов в HDF5
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+
+# Запись результатов расчета по НДМ в HDF5 с индексом XDMF для просмотра в ParaView
+# Геометрия сечения (центры волокон бетона и стержней, площади, диаметры и номера материалов) записывается один раз,
+# напряжения и деформации волокон дописываются по загружениям в расширяемые сжатые массивы (загружения x волокна),
+# разбитые на блоки по несколько загружений. Файл XDMF содержит временную серию (время - номер загружения),
+# каждый шаг которой ссылается на строку массива HDF5, поэтому ParaView читает только просматриваемые загружения.
+# Структура файла HDF5:
+# /Concrete/geometry, /Concrete/area, /Concrete/material - волокна бетона
+# /Rebar/geometry, /Rebar/area, /Rebar/diameter, /Rebar/material - стержни арматуры
+# /Results/sigmab, /Results/epsb, /Results/sigmaS, /Results/epsS - результаты (загружения x волокна)
+# /Cases/loads (Nz, Mx, My), /Cases/converged, /Cases/iterations, /Cases/delta (Nz, Mx, My) - данные загружений
+
+# Результаты и набор волокон, к которому они относятся
+FIELDS = (("sigmab", "Concrete"), ("epsb", "Concrete"), ("sigmaS", "Rebar"), ("epsS", "Rebar"))
+
+
+# Класс записи результатов; используется как контекстный менеджер или с явным вызовом Close
+# file - файл HDF5 (файл XDMF создается рядом с расширением .xdmf), chunkCases - число загружений в блоке
+# (по умолчанию блок около 256 КБ), compression и level - фильтр сжатия HDF5, dtype - тип значений результатов
+class ResultWriter:
+    def __init__(self, file, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, RebarDiam=None,
+                 ConcreteMat=None, RebarMat=None, chunkCases=None, compression="gzip", level=4, dtype=float):
+        if h5py is None:
+            raise ImportError("h5py is required for HDF5 export")
+        self.file = file
+        self.xdmf = os.path.splitext(file)[0] + ".xdmf"
+        self.nb = len(ConcreteX)
+        self.ns = len(RebarX)
+        self.cases = 0
+        self.h5 = h5py.File(file, "w")
+        groups = (("Concrete", ConcreteX, ConcreteY, ConcreteArea, ConcreteMat),
+                  ("Rebar", RebarX, RebarY, RebarArea, RebarMat))
+        for name, X, Y, Area, Mat in groups:
+            g = self.h5.create_group(name)
+            g["geometry"] = np.column_stack([X, Y, np.zeros(len(X))]).astype(float)
+            g["area"] = np.asarray(Area, dtype=float)
+            g["material"] = np.zeros(len(X), dtype=np.int64) if Mat is None else np.asarray(Mat, dtype=np.int64)
+        if RebarDiam is not None:
+            self.h5["Rebar"]["diameter"] = np.asarray(RebarDiam, dtype=float)
+
+        options = {} if compression is None else {"compression": compression}
+        if compression == "gzip":
+            options["compression_opts"] = level
+        results = self.h5.create_group("Results")
+        for name, fibres in FIELDS:
+            n = self.nb if fibres == "Concrete" else self.ns
+            # Для пустого набора волокон (сечение без арматуры) размер блока выбирает h5py
+            chunks = (chunkCases or min(max(32768 // n, 1), 1024), n) if n > 0 else True
+            results.create_dataset(name, shape=(0, n), maxshape=(None, n), chunks=chunks, dtype=dtype,
+                                   shuffle=compression is not None, **options)
+        cases = self.h5.create_group("Cases")
+        for name, shape, kind in (("loads", (3,), float), ("converged", (), bool), ("iterations", (), np.int64),
+                                  ("delta", (3,), float)):
+            cases.create_dataset(name, shape=(0,) + shape, maxshape=(None,) + shape, chunks=(1024,) + shape, dtype=kind,
+                                 **options)
+
+    # Метод дописывает результаты одного загружения (одномерные массивы) или части загружений (загружения x волокна)
+    # loads - усилия [Nz, Mx, My] загружений, status - NDMStatus расчета (скаляры или массивы по загружениям)
+    def Append(self, sigmab, epsb, sigmaS, epsS, loads=None, status=None):
+        values = {"sigmab": sigmab, "epsb": epsb, "sigmaS": sigmaS, "epsS": epsS}
+        n = np.atleast_2d(np.asarray(sigmab)).shape[0]
+        start, stop = self.cases, self.cases + n
+        for name, fibres in FIELDS:
+            dataset = self.h5["Results"][name]
+            dataset.resize(stop, axis=0)
+            dataset[start:stop] = np.asarray(values[name]).reshape(n, dataset.shape[1])
+        cases = self.h5["Cases"]
+        for name in ("loads", "converged", "iterations", "delta"):
+            cases[name].resize(stop, axis=0)
+        cases["loads"][start:stop] = np.nan if loads is None else np.asarray(loads, dtype=float).reshape(n, 3)
+        if status is not None:
+            cases["converged"][start:stop] = np.asarray(status.converged).reshape(n)
+            cases["iterations"][start:stop] = np.asarray(status.iterations).reshape(n)
+            cases["delta"][start:stop] = np.column_stack([np.asarray(status.deltaNz).reshape(n),
+                                                          np.asarray(status.deltaMx).reshape(n),
+                                                          np.asarray(status.deltaMy).reshape(n)])
+        self.cases = stop
+
+    # Метод записывает индекс XDMF для записанных загружений (файл перезаписывается целиком)
+    def WriteXdmf(self):
+        h5 = os.path.basename(self.file)
+        lines = ['<?xml version="1.0"?>',
+                 '<!DOCTYPE Xdmf SYSTEM "Xdmf.dtd" []>',
+                 '<Xdmf Version="3.0" xmlns:xi="http://www.w3.org/2001/XInclude">',
+                 '  <Domain>']
+        for fibres, n in (("Concrete", self.nb), ("Rebar", self.ns)):
+            if n == 0:
+                continue
+            series = "TimeSeries_" + fibres
+            lines.append('    <Grid Name="%s" GridType="Collection" CollectionType="Temporal">' % series)
+            for k in range(self.cases):
+                if k == 0:
+                    lines += ['      <Grid Name="%s" GridType="Uniform">' % fibres,
+                              '        <Topology TopologyType="Polyvertex" NumberOfElements="%d" NodesPerElement="1" />' % n,
+                              '        <Geometry GeometryType="XYZ">',
+                              '          <DataItem Dimensions="%d 3" Format="HDF">%s:/%s/geometry</DataItem>' % (n, h5, fibres),
+                              '        </Geometry>',
+                              '        <Attribute Name="area" AttributeType="Scalar" Center="Node">',
+                              '          <DataItem Dimensions="%d" Format="HDF">%s:/%s/area</DataItem>' % (n, h5, fibres),
+                              '        </Attribute>']
+                else:
+                    lines += ['      <Grid>',
+                              '        <xi:include xpointer="xpointer(//Grid[@Name=&quot;%s&quot;]/Grid[1]/*'
+                              '[self::Topology or self::Geometry or self::Attribute[@Name=&quot;area&quot;]])" />' % series]
+                lines.append('        <Time Value="%d" />' % k)
+                for name, f in FIELDS:
+                    if f != fibres:
+                        continue
+                    lines += ['        <Attribute Name="%s" AttributeType="Scalar" Center="Node">' % name,
+                              '          <DataItem ItemType="HyperSlab" Dimensions="1 %d">' % n,
+                              '            <DataItem Dimensions="3 2" Format="XML">%d 0 1 1 1 %d</DataItem>' % (k, n),
+                              '            <DataItem Dimensions="%d %d" Format="HDF">%s:/Results/%s</DataItem>'
+                              % (self.cases, n, h5, name),
+                              '          </DataItem>',
+                              '        </Attribute>']
+                lines.append('      </Grid>')
+            lines.append('    </Grid>')
+        lines += ['  </Domain>', '</Xdmf>']
+        with open(self.xdmf, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    # Метод записывает индекс XDMF и закрывает файл HDF5
+    def Close(self):
+        if self.h5 is None:
+            return
+        self.WriteXdmf()
+        self.h5.close()
+        self.h5 = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+
+# Функция записи результатов пакета загружений (массивы загружения x волокна) в HDF5 и XDMF
+# Nz, Mx, My - усилия загружений, status - NDMStatus с массивами по загружениям (например, от NDMBatch)
+def exportResults(file, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, sigmab, epsb, sigmaS, epsS,
+                  Nz=None, Mx=None, My=None, status=None, RebarDiam=None, ConcreteMat=None, RebarMat=None, **kwargs):
+    loads = None if Nz is None else np.column_stack(np.broadcast_arrays(np.atleast_1d(Nz), Mx, My))
+    with ResultWriter(file, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, RebarDiam,
+                      ConcreteMat, RebarMat, **kwargs) as writer:
+        writer.Append(sigmab, epsb, sigmaS, epsS, loads, status)
@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import ParallelModule
+
+
+# Класс поверхности взаимодействия N-Mx-My, заданной треугольниками
+class InteractionSurface:
+    def __init__(self, Nz, Mx, My, triangles, angles):
+        self.Nz = Nz  # Продольные усилия в узлах поверхности, МН
+        self.Mx = Mx  # Изгибающие моменты относительно оси X, МН*м
+        self.My = My  # Изгибающие моменты относительно оси Y, МН*м
+        self.triangles = triangles  # Номера узлов треугольников (m x 3)
+        self.angles = angles  # Углы наклона нейтральной оси, рад
+
+    # Метод возвращает коэффициент использования сечения для заданных усилий
+    # Коэффициент равен отношению длины вектора усилий к расстоянию от начала координат
+    # до поверхности в том же направлении (луч из начала координат, алгоритм Моллера-Трумбора)
+    def Utilization(self, Nz, Mx, My):
+        Nz, Mx, My = np.broadcast_arrays(np.atleast_1d(np.asarray(Nz, dtype=float)),
+                                         np.asarray(Mx, dtype=float), np.asarray(My, dtype=float))
+        P = np.stack([self.Nz, self.Mx, self.My], axis=1)
+        V0 = P[self.triangles[:, 0]]
+        E1 = P[self.triangles[:, 1]] - V0
+        E2 = P[self.triangles[:, 2]] - V0
+        Dir = np.stack([Nz, Mx, My], axis=1)
+        # Масштабируем оси, чтобы продольные усилия и моменты были сопоставимы
+        scale = np.array([np.ptp(self.Nz), np.ptp(self.Mx), np.ptp(self.My)])
+        scale[scale == 0] = 1
+        V0, E1, E2, Dir = V0 / scale, E1 / scale, E2 / scale, Dir / scale
+        utilization = np.zeros(len(Dir))
+        for k in range(len(Dir)):
+            d = Dir[k]
+            if not np.any(d):
+                continue
+            h = np.cross(d, E2)
+            a = np.einsum("ij,ij->i", E1, h)
+            valid = np.abs(a) > 1e-14
+            f = np.zeros_like(a)
+            f[valid] = 1 / a[valid]
+            s = -V0
+            u = f * np.einsum("ij,ij->i", s, h)
+            q = np.cross(s, E1)
+            v = f * (q @ d)
+            t = f * np.einsum("ij,ij->i", E2, q)
+            eps = 1e-9
+            hit = valid & (u >= -eps) & (v >= -eps) & (u + v <= 1 + eps) & (t > 0)
+            if hit.any():
+                utilization[k] = 1 / t[hit].min()
+            else:
+                utilization[k] = np.inf
+        return utilization
+
+
+# Функция возвращает предельные плоскости деформаций (eps_top, eps_bot) для сечения высотой h
+# ds - расстояние от сжатой грани до наиболее растянутой арматуры
+# Участок 1: поворот вокруг растянутой арматуры (eps_s = epssu), eps_top от epssu до epsbu
+# Участок 2: поворот вокруг сжатой грани (eps_top = epsbu), eps_bot до нуля
+# Участок 3: поворот вокруг точки C (eps = epsb0), eps_bot от нуля до epsb0 (равномерное сжатие)
+def _limitPlanes(h, ds, epsbu, epsb0, epssu, nDepth):
+    t = np.linspace(0, 1, nDepth)
+    eps_top1 = epssu + (epsbu - epssu) * t
+    eps_bot1 = eps_top1 + (epssu - eps_top1) * h / ds
+    eps_bot2 = eps_bot1[-1] * (1 - t[1:])
+    eps_top2 = np.full(nDepth - 1, epsbu)
+    dC = (1 - epsb0 / epsbu) * h
+    eps_bot3 = epsb0 * t[1:]
+    eps_top3 = epsb0 + (epsb0 - eps_bot3) * dC / (h - dC)
+    eps_top = np.hstack([eps_top1, eps_top2, eps_top3])
+    eps_bot = np.hstack([eps_bot1, eps_bot2, eps_bot3])
+    return eps_top, eps_bot
+
+
+# Функция вычисляет точки поверхности взаимодействия для заданных углов наклона нейтральной оси
+def _surfacePoints(angles, sigmab_func, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                   epsbu, epsb0, epssu, nDepth, concreteTension):
+    Nz = []
+    Mx = []
+    My = []
+    for theta in angles:
+        # Координата волокон вдоль направления, перпендикулярного нейтральной оси
+        db = ConcreteX * np.cos(theta) + ConcreteY * np.sin(theta)
+        dS = RebarX * np.cos(theta) + RebarY * np.sin(theta)
+        dtop = db.min()
+        h = db.max() - dtop
+        ds = dS.max() - dtop if len(dS) and dS.max() > dtop else h
+        eps_top, eps_bot = _limitPlanes(h, ds, epsbu, epsb0, epssu, nDepth)
+        # Деформации волокон для всех предельных плоскостей (плоскости x волокна)
+        k = (eps_bot - eps_top) / h
+        epsb = eps_top[:, None] + k[:, None] * (db - dtop)
+        epsS = eps_top[:, None] + k[:, None] * (dS - dtop)
+        sigmab = sigmab_func(epsb)
+        if not concreteTension:
+            sigmab[epsb > 0] = 0
+        sigmaS = sigmas_func(epsS)
+        Nz.append(sigmab @ ConcreteArea + sigmaS @ RebarArea)
+        Mx.append(sigmab @ (ConcreteArea * ConcreteX) + sigmaS @ (RebarArea * RebarX))
+        My.append(sigmab @ (ConcreteArea * ConcreteY) + sigmaS @ (RebarArea * RebarY))
+    return np.array(Nz), np.array(Mx), np.array(My)
+
+
+# Функция построения поверхности взаимодействия N-Mx-My по предельным плоскостям деформаций
+# nAngles - число углов наклона нейтральной оси, nDepth - число плоскостей на каждом участке
+# epsbu - предельная деформация сжатого бетона, epsb0 - предельная деформация при равномерном сжатии,
+# epssu - предельная деформация растянутой арматуры. Углы распределяются по workers процессам
+# (None - по числу доступных процессу ядер, 1 - расчет в текущем процессе)
+def InteractionSurfaceNMM(sigmab_func, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                          nAngles=72, nDepth=30, epsbu=-0.0035, epsb0=-0.002, epssu=0.025, concreteTension=False,
+                          workers=None):
+    angles = np.linspace(0, 2 * np.pi, nAngles, endpoint=False)
+    args = (sigmab_func, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+            epsbu, epsb0, epssu, nDepth, concreteTension)
+    if workers is None:
+        workers = ParallelModule._cpuCount()
+    workers = min(workers, nAngles)
+    if workers > 1:
+        chunks = np.array_split(angles, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_surfacePoints, chunks, *[[a] * workers for a in args]))
+        Nz = np.vstack([p[0] for p in parts])
+        Mx = np.vstack([p[1] for p in parts])
+        My = np.vstack([p[2] for p in parts])
+    else:
+        Nz, Mx, My = _surfacePoints(angles, *args)
+    # Триангуляция сетки (углы x плоскости) с замыканием по углу
+    nPlanes = Nz.shape[1]
+    i, j = np.meshgrid(np.arange(nAngles), np.arange(nPlanes - 1), indexing="ij")
+    i1 = (i + 1) % nAngles
+    p00 = i * nPlanes + j
+    p10 = i1 * nPlanes + j
+    p01 = i * nPlanes + j + 1
+    p11 = i1 * nPlanes + j + 1
+    triangles = np.vstack([np.stack([p00, p10, p11], axis=-1).reshape(-1, 3),
+                           np.stack([p00, p11, p01], axis=-1).reshape(-1, 3)])
+    return InteractionSurface(Nz.ravel(), Mx.ravel(), My.ravel(), triangles, angles)
@@ -0,0 +1,133 @@
+import numpy as np
+import DiagramModule
+
+# Необязательный модуль Numba: при его отсутствии NdmModule использует реализацию на NumPy
+try:
+    import numba
+except ImportError:
+    numba = None
+
+AVAILABLE = numba is not None
+
+
+# Функция компилирует функцию Numba (с сохранением результата компиляции на диске), если Numba установлена
+def _jit(func):
+    return numba.njit(cache=True)(func) if numba is not None else func
+
+
+# Функция проверяет, что все диаграммы являются кусочно-линейными диаграммами Diagram
+# (диаграммы с температурами волокон ThermalDiagram вычисляются только на NumPy)
+def supported(*funcs):
+    for f in funcs:
+        for d in (f if isinstance(f, (list, tuple)) else [f]):
+            if type(d) is not DiagramModule.Diagram:
+                return False
+    return True
+
+
+# Кэш массивов диаграмм для ядра: номера объектов диаграмм -> (диаграммы, массивы)
+_TABLES = {}
+
+
+# Функция объединяет точки диаграмм в общие массивы для ядра
+# Возвращает деформации, напряжения и наклоны участков (с нулем в последней точке каждой диаграммы),
+# а также начало и конец точек каждой диаграммы в общих массивах. Результат кэшируется для тех же объектов диаграмм
+def diagramTables(funcs):
+    key = tuple(id(f) for f in funcs)
+    if key in _TABLES:
+        return _TABLES[key][1]
+    if len(_TABLES) >= 256:
+        _TABLES.clear()
+    eps = np.concatenate([f.eps for f in funcs])
+    sigma = np.concatenate([f.sigma for f in funcs])
+    slope = np.concatenate([np.append(f.slope, 0.0) for f in funcs])
+    sizes = np.array([len(f.eps) for f in funcs], dtype=np.int64)
+    end = np.cumsum(sizes)
+    tables = (eps, sigma, slope, end - sizes, end)
+    # Диаграммы хранятся вместе с массивами, чтобы номера объектов не могли быть использованы повторно
+    _TABLES[key] = (list(funcs), tables)
+    return tables
+
+
+# Итерации НДМ по секущим модулям для одного загружения, скомпилированные целиком:
+# сборка жесткости, решение системы 3x3 в явном виде, вычисление напряжений по диаграммам и проверка невязок
+# group - номер диаграммы волокна, E - начальные секущие модули (заменяются модулями последней итерации),
+# plane - начальная плоскость деформаций [1/rx, 1/ry, eps0] (заменяется найденной)
+# Возвращает число итераций, код завершения (0 - сходимость, 1 - превышено число итераций, 2 - расходимость)
+# и относительные невязки [Nz, Mx, My]
+@_jit
+def secant(X, Y, Area, group, dEps, dSigma, dSlope, dStart, dEnd, E, Nz, Mx, My, deltaMN, maxIter, divergence,
+           epsLimit, eps, sigma, plane):
+    n = len(X)
+    deltaNz = 1.0 if Nz != 0 else 0.0
+    deltaMx = 1.0 if Mx != 0 else 0.0
+    deltaMy = 1.0 if My != 0 else 0.0
+    iterations = 0
+    code = 0
+    while deltaNz >= deltaMN or deltaMx >= deltaMN or deltaMy >= deltaMN:
+        if iterations >= maxIter:
+            code = 1
+            break
+        iterations += 1
+        # Жесткостные характеристики сечения
+        D11 = D22 = D12 = D13 = D23 = D33 = 0.0
+        for i in range(n):
+            ea = E[i] * Area[i]
+            x = X[i]
+            y = Y[i]
+            D11 += ea * x * x
+            D22 += ea * y * y
+            D12 += ea * x * y
+            D13 += ea * x
+            D23 += ea * y
+            D33 += ea
+        # Решение симметричной системы 3x3 по формулам Крамера
+        c11 = D22 * D33 - D23 * D23
+        c12 = D13 * D23 - D12 * D33
+        c13 = D12 * D23 - D13 * D22
+        det = D11 * c11 + D12 * c12 + D13 * c13
+        if not (det != 0 and np.isfinite(det)):
+            code = 2
+            break
+        c22 = D11 * D33 - D13 * D13
+        c23 = D12 * D13 - D11 * D23
+        c33 = D11 * D22 - D12 * D12
+        kx = (c11 * Mx + c12 * My + c13 * Nz) / det
+        ky = (c12 * Mx + c22 * My + c23 * Nz) / det
+        eps0 = (c13 * Mx + c23 * My + c33 * Nz) / det
+        plane[0] = kx
+        plane[1] = ky
+        plane[2] = eps0
+        # Деформации, напряжения и секущие модули волокон, внутренние усилия
+        Mxr = Myr = Nzr = 0.0
+        exceeded = False
+        for i in range(n):
+            e = eps0 + kx * X[i] + ky * Y[i]
+            eps[i] = e
+            if not abs(e) <= epsLimit:
+                exceeded = True
+            # Номер участка диаграммы: последняя точка с деформацией меньше e (с экстраполяцией крайних участков)
+            g = group[i]
+            lo = dStart[g]
+            hi = dEnd[g]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if dEps[mid] < e:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            j = min(max(lo - 1, dStart[g]), dEnd[g] - 2)
+            s = dSigma[j] + dSlope[j] * (e - dEps[j])
+            sigma[i] = s
+            E[i] = s / e if e != 0 else dSlope[j]
+            sa = s * Area[i]
+            Mxr += sa * X[i]
+            Myr += sa * Y[i]
+            Nzr += sa
+        if Nz != 0: deltaNz = abs((Nz - Nzr) / Nz)
+        if Mx != 0: deltaMx = abs((Mx - Mxr) / Mx)
+        if My != 0: deltaMy = abs((My - Myr) / My)
+        if not max(deltaNz, deltaMx, deltaMy) <= divergence or exceeded:
+            code = 2
+            break
+    return iterations, code, deltaNz, deltaMx, deltaMy
@@ -0,0 +1,125 @@
+import numpy as np
+from NdmModule import _geometry, _stiffness
+
+
+# Класс для хранения диаграммы момент-кривизна
+class MomentCurvatureCurve:
+    def __init__(self, kappa, M, eps0, iterations, peak):
+        self.kappa = kappa  # Кривизна, 1/м
+        self.M = M  # Изгибающий момент, МН*м
+        self.eps0 = eps0  # Деформация в начале координат
+        self.iterations = iterations  # Количество итераций на каждом шаге
+        self.peak = peak  # Номер точки с максимальным моментом
+        self.descending = np.arange(len(M)) > peak  # Признак точек нисходящей ветви
+
+
+# Функция находит плоскость деформаций X = [1/rx, 1/ry, eps0], удовлетворяющую уравнениям равновесия
+# free - номера неизвестных, определяемых из уравнений [Mx, My, Nz] с теми же номерами, остальные неизвестные
+# фиксированы. Расчет начинается с плоскости X (продолжение по параметру) и ведется методом Ньютона
+# (tangent = True) или итерациями по секущей жесткости, как в функции NDM (tangent = False)
+def _solvePlane(X, free, Target, sigmab_func, sigmas_func, ConcreteX, ConcreteY, RebarX, RebarY, Gb, Gs, tol, maxIter,
+                tangent=True):
+    fixed = [i for i in range(3) if i not in free]
+
+    # Функция возвращает состояние сечения и относительную невязку для плоскости деформаций X
+    # Невязка относится к заданному усилию, а при нулевом усилии - к сумме модулей усилий по волокнам
+    def residual(X):
+        epsb = X[2] + X[0] * ConcreteX + X[1] * ConcreteY
+        epsS = X[2] + X[0] * RebarX + X[1] * RebarY
+        sigmab, Ebsec, Ebtan = sigmab_func.Evaluate(epsb)
+        sigmaS, Essec, Estan = sigmas_func.Evaluate(epsS)
+        F = sigmab @ Gb[:, 3:6] + sigmaS @ Gs[:, 3:6]
+        Scale = np.where(Target != 0, np.abs(Target), np.abs(sigmab) @ np.abs(Gb[:, 3:6]) + np.abs(sigmaS) @ np.abs(Gs[:, 3:6]))
+        delta = np.divide(np.abs(Target - F), Scale, out=np.zeros(3), where=Scale != 0)[free]
+        return X, F, epsb, epsS, (Ebsec, Ebtan, Essec, Estan), delta
+
+    state = residual(np.array(X, dtype=float))
+    for iterations in range(maxIter + 1):
+        X, F, epsb, epsS, moduli, delta = state
+        if np.all(delta <= tol):
+            return X, F, epsb, epsS, iterations, True
+        if iterations == maxIter:
+            break
+        Ebsec, Ebtan, Essec, Estan = moduli
+        # Шаг Ньютона по касательной жесткости; если он не уменьшает невязку (например, при образовании трещин),
+        # выполняется шаг по секущей жесткости, как в функции NDM
+        Xn = X.copy()
+        accepted = False
+        try:
+            if tangent:
+                Xn[free] += np.linalg.solve(_stiffness(Ebtan @ Gb + Estan @ Gs)[np.ix_(free, free)], (Target - F)[free])
+                trial = residual(Xn)
+                accepted = np.linalg.norm(trial[5]) < np.linalg.norm(delta)
+        except np.linalg.LinAlgError:
+            pass
+        if not accepted:
+            B = _stiffness(Ebsec @ Gb + Essec @ Gs)
+            Xn = X.copy()
+            Xn[free] = np.linalg.solve(B[np.ix_(free, free)], Target[free] - B[np.ix_(free, fixed)] @ X[fixed])
+            trial = residual(Xn)
+        if not np.all(np.isfinite(trial[0])):
+            break
+        state = trial
+    return X, F, epsb, epsS, iterations, False
+
+
+# Функция построения диаграммы момент-кривизна при постоянной продольной силе Nz
+# axis = "x" - изгиб моментом Mx (кривизна 1/rx), "y" - моментом My (кривизна 1/ry); второй момент равен нулю
+# control = "curvature" - кривизна увеличивается равными шагами до kappaMax, позволяя пройти вершину
+# и нисходящую ветвь (метод Ньютона); "moment" - момент увеличивается равными шагами до Mmax
+# (итерации по секущей жесткости), расчет завершается при потере сходимости (достижении несущей способности).
+# Каждый шаг начинается с плоскости деформаций, полученной на предыдущем шаге.
+# Расчет прекращается, когда момент на нисходящей ветви падает ниже dropRatio от максимального
+# или деформации волокон превышают epsLimit
+def MomentCurvature(Nz, sigmab_func, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                    kappaMax=None, Mmax=None, nSteps=100, axis="x", control="curvature", tol=1e-3, maxIter=50,
+                    dropRatio=0.8, epsLimit=0.1):
+    if axis not in ("x", "y"):
+        raise ValueError("Unknown bending axis: " + str(axis))
+    Gb = _geometry(ConcreteX, ConcreteY, ConcreteArea)
+    Gs = _geometry(RebarX, RebarY, RebarArea)
+    m = 0 if axis == "x" else 1
+    if control == "curvature":
+        if kappaMax is None:
+            raise ValueError("kappaMax is required for curvature control")
+        steps = np.linspace(0, kappaMax, nSteps + 1)[1:]
+        free = [1 - m, 2]
+    elif control == "moment":
+        if Mmax is None:
+            raise ValueError("Mmax is required for moment control")
+        steps = np.linspace(0, Mmax, nSteps + 1)[1:]
+        free = [0, 1, 2]
+    else:
+        raise ValueError("Unknown control: " + str(control))
+    Target = np.array([0.0, 0.0, Nz])
+
+    # Начальное состояние - равновесие при действии только продольной силы
+    X, F, epsb, epsS, iterations, converged = _solvePlane(np.zeros(3), [1 - m, 2] if Nz != 0 else [], Target,
+                                                          sigmab_func, sigmas_func, ConcreteX, ConcreteY, RebarX, RebarY,
+                                                          Gb, Gs, tol, maxIter)
+    kappa = [X[m]]
+    M = [F[m]]
+    eps0 = [X[2]]
+    iters = [iterations]
+    peak = 0
+    for step in steps:
+        if control == "curvature":
+            X[m] = step
+        else:
+            Target[m] = step
+        X, F, epsb, epsS, iterations, converged = _solvePlane(X, free, Target, sigmab_func, sigmas_func,
+                                                              ConcreteX, ConcreteY, RebarX, RebarY, Gb, Gs, tol, maxIter,
+                                                              tangent=control == "curvature")
+        if not converged or max(np.abs(epsb).max(initial=0), np.abs(epsS).max(initial=0)) > epsLimit:
+            break
+        kappa.append(X[m])
+        M.append(F[m])
+        eps0.append(X[2])
+        iters.append(iterations)
+        if abs(M[-1]) > abs(M[peak]):
+            peak = len(M) - 1
+        # Нисходящая ветвь
+        if len(M) - 1 > peak and abs(M[-1]) < dropRatio * abs(M[peak]):
+            break
+    return MomentCurvatureCurve(np.array(kappa), np.array(M), np.array(eps0), np.array(iters), peak)
+
@@ -0,0 +1,77 @@
+import json
+import time
+import numpy as np
+
+
+# Класс для сбора сведений о работе решателя НДМ
+# Передается в NDM (параметр monitor) и записывает для каждого расчета невязки на каждой итерации,
+# число итераций и время по этапам: сборка матрицы жесткости, решение системы, вычисление напряжений
+# по диаграммам и вычисление невязок. callback(record, iteration, deltaNz, deltaMx, deltaMy) вызывается
+# после каждой итерации. При trace = False невязки по итерациям не сохраняются
+class NDMMonitor:
+    PHASES = ("assembly", "solve", "material", "residual")
+
+    def __init__(self, callback=None, trace=True):
+        self.callback = callback
+        self.trace = trace
+        self.records = []
+        self._start = None
+
+    # Начало расчета загружения
+    def Start(self, Nz, Mx, My, method):
+        record = {"case": len(self.records), "Nz": float(Nz), "Mx": float(Mx), "My": float(My), "method": method,
+                  "iterations": 0, "converged": None, "message": None, "time": 0.0,
+                  "phases": dict.fromkeys(self.PHASES, 0.0), "trace": []}
+        self.records.append(record)
+        self._start = time.perf_counter()
+        return record
+
+    # Запись итерации: относительные невязки и время этапов (в порядке PHASES)
+    def Iteration(self, deltaNz, deltaMx, deltaMy, times):
+        record = self.records[-1]
+        record["iterations"] += 1
+        phases = record["phases"]
+        for name, t in zip(self.PHASES, times):
+            phases[name] += t
+        if self.trace:
+            record["trace"].append([float(deltaNz), float(deltaMx), float(deltaMy)])
+        if self.callback is not None:
+            self.callback(record, record["iterations"], deltaNz, deltaMx, deltaMy)
+
+    # Завершение расчета загружения
+    def Finish(self, converged, message):
+        record = self.records[-1]
+        record["time"] = time.perf_counter() - self._start
+        record["converged"] = bool(converged)
+        record["message"] = message
+
+    # Метод возвращает сводку по всем записанным расчетам
+    # slowest - число загружений с наибольшим количеством итераций, включаемых в сводку
+    def Summary(self, slowest=10):
+        if not self.records:
+            return {"cases": 0}
+        iterations = np.array([r["iterations"] for r in self.records])
+        times = np.array([r["time"] for r in self.records])
+        messages = [r["message"] for r in self.records]
+        phases = {name: float(sum(r["phases"][name] for r in self.records)) for name in self.PHASES}
+        order = np.argsort(-iterations, kind="stable")[:slowest]
+        return {
+            "cases": len(self.records),
+            "converged": messages.count("converged"),
+            "maxiter": messages.count("maxiter"),
+            "diverged": messages.count("diverged"),
+            "iterations": {"total": int(iterations.sum()), "mean": float(iterations.mean()),
+                           "max": int(iterations.max()), "p95": float(np.percentile(iterations, 95))},
+            "time": {"total": float(times.sum()), "mean": float(times.mean()), "max": float(times.max())},
+            "phases": phases,
+            "slowest": [{k: self.records[i][k] for k in ("case", "Nz", "Mx", "My", "iterations", "message")}
+                        for i in order],
+        }
+
+    # Метод сохраняет сводку и (при records = True) записи по загружениям в файл JSON
+    def Export(self, file, records=True):
+        data = {"summary": self.Summary()}
+        if records:
+            data["records"] = self.records
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
@@ -0,0 +1,309 @@
+import numpy as np
+import ConcreteModule
+import RebarModule
+
+
+# Типы элементов gmsh: (количество узлов, количество угловых узлов)
+ELEMENT_TYPES = {
+    15: (1, 1),  # Точка
+    1: (2, 2), 8: (3, 2), 26: (4, 2), 27: (5, 2), 28: (6, 2),  # Отрезки 1-5 порядка
+    2: (3, 3), 9: (6, 3), 20: (9, 3), 21: (10, 3), 22: (12, 3), 23: (15, 3), 24: (15, 3), 25: (21, 3),  # Треугольники
+    3: (4, 4), 16: (8, 4), 10: (9, 4), 36: (16, 4), 37: (25, 4), 38: (36, 4),  # Четырехугольники
+}
+
+
+# Класс сетки, прочитанной из файла формата MSH 4.1
+class Mesh:
+    def __init__(self):
+        self.physicalNames = {}  # Имена физических групп: (размерность, номер группы) -> имя
+        self.entityPhysicals = {}  # Физические группы объектов: (размерность, номер объекта) -> [номера групп]
+        self.nodeTags = np.zeros(0, dtype=np.uint64)  # Номера узлов
+        self.nodeCoords = np.zeros((0, 3))  # Координаты узлов
+        self.nodeEntities = np.zeros((0, 2), dtype=np.int64)  # Объект (размерность, номер), которому принадлежит узел
+        self.elementBlocks = []  # Блоки элементов: (размерность, номер объекта, тип, номера элементов, узлы)
+
+    # Метод возвращает строки массива узлов для заданных номеров узлов
+    def NodeIndex(self, tags):
+        index = np.zeros(int(self.nodeTags.max()) + 1, dtype=np.int64)
+        index[self.nodeTags.astype(np.int64)] = np.arange(len(self.nodeTags))
+        return index[np.asarray(tags, dtype=np.int64)]
+
+
+# Функция вычисляет центры тяжести и площади многоугольных элементов
+# X, Y - координаты угловых узлов (элементы x узлы), узлы обходятся по контуру элемента
+def getElementGeometry(X, Y):
+    if X.shape[1] == 3:
+        X0 = (X[:, 0] + X[:, 1] + X[:, 2]) / 3
+        Y0 = (Y[:, 0] + Y[:, 1] + Y[:, 2]) / 3
+        Elem_Area = 0.5 * np.abs((X[:, 1] - X[:, 0]) * (Y[:, 2] - Y[:, 0]) - (X[:, 2] - X[:, 0]) * (Y[:, 1] - Y[:, 0]))
+    else:
+        # Формула площади Гаусса и центра тяжести многоугольника
+        Xn = np.roll(X, -1, axis=1)
+        Yn = np.roll(Y, -1, axis=1)
+        cross = X * Yn - Xn * Y
+        A = 0.5 * cross.sum(axis=1)
+        X0 = ((X + Xn) * cross).sum(axis=1) / (6 * A)
+        Y0 = ((Y + Yn) * cross).sum(axis=1) / (6 * A)
+        Elem_Area = np.abs(A)
+    return X0, Y0, np.round(Elem_Area, 8)
+
+
+# Класс последовательного чтения файла MSH в текстовом или двоичном формате
+class _MshStream:
+    def __init__(self, f):
+        self.f = f
+        self.binary = False
+        self.sizeT = np.dtype(np.uint64)
+        self.int = np.dtype(np.int32)
+        self.double = np.dtype(np.float64)
+
+    def line(self):
+        s = self.f.readline()
+        if not s:
+            raise ValueError("Unexpected end of MSH file")
+        return s.strip()
+
+    # Чтение count значений типа dtype (в текстовом формате - из следующих строк файла)
+    def array(self, dtype, count):
+        if self.binary:
+            return np.frombuffer(self.f.read(dtype.itemsize * count), dtype=dtype, count=count)
+        values = []
+        while len(values) < count:
+            values.extend(self.line().split())
+        return np.array(values, dtype=dtype if dtype != self.int else np.int64)
+
+    # Чтение записи из целых чисел и чисел с плавающей точкой заданной структуры (для двоичного формата)
+    def fields(self, types):
+        if self.binary:
+            return [self.array(t, 1)[0] for t in types]
+        tokens = self.line().split()
+        return [float(v) if t == self.double else int(v) for v, t in zip(tokens, types)]
+
+    def tokens(self):
+        return self.line().split()
+
+    def end(self, section):
+        if self.binary:
+            # После двоичных данных следует перевод строки
+            s = self.line()
+            if not s:
+                s = self.line()
+        else:
+            s = self.line()
+        if s != b"$End" + section:
+            raise ValueError("Expected $End" + section.decode() + " in MSH file")
+
+
+# Функция чтения файла сетки формата MSH 4.1 (текстового или двоичного) без использования gmsh
+# Читаются разделы $PhysicalNames, $Entities, $Nodes и $Elements, остальные разделы пропускаются
+def readMsh(file):
+    mesh = Mesh()
+    with open(file, "rb") as f:
+        s = _MshStream(f)
+        while True:
+            header = f.readline()
+            if not header:
+                break
+            header = header.strip()
+            if header == b"$MeshFormat":
+                version, fileType, dataSize = s.tokens()
+                if not version.startswith(b"4.1"):
+                    raise ValueError("Only MSH 4.1 format is supported, got " + version.decode())
+                s.binary = fileType == b"1"
+                if s.binary:
+                    s.sizeT = np.dtype("u%d" % int(dataSize))
+                    if s.array(s.int, 1)[0] != 1:
+                        raise ValueError("MSH file has different endianness")
+                s.end(b"MeshFormat")
+            elif header == b"$PhysicalNames":
+                for i in range(int(s.line())):
+                    dim, tag, name = s.line().split(maxsplit=2)
+                    mesh.physicalNames[(int(dim), int(tag))] = name.strip(b'"').decode()
+                s.end(b"PhysicalNames")
+            elif header == b"$Entities":
+                _readEntities(s, mesh)
+                s.end(b"Entities")
+            elif header == b"$Nodes":
+                _readNodes(s, mesh)
+                s.end(b"Nodes")
+            elif header == b"$Elements":
+                _readElements(s, mesh)
+                s.end(b"Elements")
+            elif header.startswith(b"$") and not header.startswith(b"$End"):
+                # Пропускаем неиспользуемые разделы (при отсутствии строки окончания раздела - ошибка)
+                end = b"$End" + header[1:]
+                while s.line() != end:
+                    pass
+    return mesh
+
+
+# Чтение раздела $Entities: сохраняются физические группы объектов
+def _readEntities(s, mesh):
+    counts = s.array(s.sizeT, 4) if s.binary else [int(v) for v in s.tokens()]
+    for dim in range(4):
+        for i in range(int(counts[dim])):
+            if s.binary:
+                tag = int(s.array(s.int, 1)[0])
+                s.array(s.double, 3 if dim == 0 else 6)
+                physicals = s.array(s.int, int(s.array(s.sizeT, 1)[0]))
+                if dim > 0:
+                    s.array(s.int, int(s.array(s.sizeT, 1)[0]))
+            else:
+                tokens = s.tokens()
+                tag = int(tokens[0])
+                k = 4 if dim == 0 else 7
+                physicals = tokens[k + 1:k + 1 + int(tokens[k])]
+            mesh.entityPhysicals[(dim, tag)] = [int(p) for p in physicals]
+
+
+# Чтение раздела $Nodes блоками непосредственно в заранее выделенные массивы
+def _readNodes(s, mesh):
+    numBlocks, numNodes, minTag, maxTag = [int(v) for v in (s.array(s.sizeT, 4) if s.binary else s.tokens())]
+    mesh.nodeTags = np.empty(numNodes, dtype=np.uint64)
+    mesh.nodeCoords = np.empty((numNodes, 3))
+    mesh.nodeEntities = np.empty((numNodes, 2), dtype=np.int64)
+    k = 0
+    for b in range(numBlocks):
+        dim, tag, parametric, n = s.fields([s.int, s.int, s.int, s.sizeT])
+        n = int(n)
+        mesh.nodeTags[k:k + n] = s.array(s.sizeT, n)
+        # Параметрические координаты (если есть) отбрасываются
+        width = 3 + (dim if parametric else 0)
+        mesh.nodeCoords[k:k + n] = s.array(s.double, n * width).reshape(n, width)[:, :3]
+        mesh.nodeEntities[k:k + n] = (dim, tag)
+        k += n
+
+
+# Чтение раздела $Elements блоками по типам элементов
+def _readElements(s, mesh):
+    numBlocks = int(s.array(s.sizeT, 4)[0] if s.binary else s.tokens()[0])
+    for b in range(numBlocks):
+        dim, tag, elemType, n = s.fields([s.int, s.int, s.int, s.sizeT])
+        n = int(n)
+        if s.binary:
+            if elemType not in ELEMENT_TYPES:
+                raise ValueError("Unsupported element type in binary MSH file: " + str(elemType))
+            data = s.array(s.sizeT, n * (1 + ELEMENT_TYPES[elemType][0])).reshape(n, -1)
+        else:
+            data = np.array([s.line().split() for i in range(n)], dtype=np.uint64).reshape(n, -1)
+        mesh.elementBlocks.append((int(dim), int(tag), int(elemType), data[:, 0], data[:, 1:]))
+
+
+# Функция разделяет материалы физических групп на списки классов бетона и арматуры без повторов
+# materials - словарь: имя физической группы -> ConcreteModule.ConcreteClass или RebarModule.RebarClass
+# Номер материала волокна в getSectionInfo равен номеру класса в соответствующем списке
+def getMaterials(materials):
+    ConcreteMaterials = []
+    RebarMaterials = []
+    for m in materials.values():
+        if isinstance(m, ConcreteModule.ConcreteClass):
+            group = ConcreteMaterials
+        elif isinstance(m, RebarModule.RebarClass):
+            group = RebarMaterials
+        else:
+            raise TypeError("Material must be ConcreteClass or RebarClass, got " + type(m).__name__)
+        if not any(m is g for g in group):
+            group.append(m)
+    return ConcreteMaterials, RebarMaterials
+
+
+# Функция возвращает материал физической группы с именем name: класс с точно совпадающим именем
+# или с самым длинным именем, с которого начинается name (например, "Rebar" для "RebarD18"); None - нет материала
+def getGroupMaterial(name, materials):
+    if name in materials:
+        return materials[name]
+    keys = [k for k in materials if name.startswith(k)]
+    return materials[max(keys, key=len)] if keys else None
+
+
+# Функция возвращает номера материалов бетона и арматуры для физических групп с именами names
+# (None, если группа не является бетонной или арматурной)
+def _groupMaterialIndex(names, materials, ConcreteMaterials, RebarMaterials):
+    index = {}
+    for n in names:
+        m = getGroupMaterial(n, materials)
+        for group in (ConcreteMaterials, RebarMaterials):
+            for k, g in enumerate(group):
+                if m is g:
+                    index[n] = k
+    return index
+
+
+# Функция для импорта и получения информации о сечении без использования gmsh
+# Возвращает те же массивы, что и SectionModule.getSectionInfo
+# materials - словарь имен физических групп и классов материалов для сечений из нескольких материалов
+# (см. getMaterials). В этом случае бетоном считаются все двумерные группы с классом бетона, и дополнительно
+# возвращаются номера материалов элементов бетона ConcreteMat и узлов арматуры RebarMat
+def getSectionInfo(file, materials=None):
+    mesh = readMsh(file)
+    if materials is not None:
+        ConcreteMaterials, RebarMaterials = getMaterials(materials)
+        index = _groupMaterialIndex(set(mesh.physicalNames.values()), materials, ConcreteMaterials, RebarMaterials)
+
+    ConcreteEntities = {}
+    RebarDiameters = {}
+    for (dim, tag), physicals in mesh.entityPhysicals.items():
+        for p in physicals:
+            n = mesh.physicalNames.get((dim, p), "")
+            if materials is None:
+                if n == "Concrete" and dim == 2:
+                    ConcreteEntities[tag] = 0
+            elif dim == 2 and isinstance(getGroupMaterial(n, materials), ConcreteModule.ConcreteClass):
+                ConcreteEntities.setdefault(tag, index[n])
+            if n.find("Rebar") > -1:
+                k = 0
+                if materials is not None:
+                    if not isinstance(getGroupMaterial(n, materials), RebarModule.RebarClass):
+                        raise ValueError("No rebar material for physical group " + n)
+                    k = index[n]
+                RebarDiameters[(dim, tag)] = (float(n[6] + n[7]) / 1000, k)  # Получаем диаметр арматуры из имени физической группы
+
+    # Узлы арматуры в порядке следования объектов в файле
+    RebarTags = []
+    RebarDiam = []
+    RebarMat = []
+    RebarX = []
+    RebarY = []
+    for (dim, tag), (diam, k) in RebarDiameters.items():
+        rows = np.flatnonzero((mesh.nodeEntities[:, 0] == dim) & (mesh.nodeEntities[:, 1] == tag))
+        RebarTags.append(mesh.nodeTags[rows])
+        RebarDiam.append(np.full(len(rows), diam))
+        RebarMat.append(np.full(len(rows), k))
+        RebarX.append(mesh.nodeCoords[rows, 0])
+        RebarY.append(mesh.nodeCoords[rows, 1])
+    RebarTags = np.concatenate(RebarTags) if RebarTags else np.zeros(0, dtype=np.uint64)
+    RebarDiam = np.concatenate(RebarDiam) if RebarDiam else np.zeros(0)
+    RebarMat = np.concatenate(RebarMat) if RebarMat else np.zeros(0, dtype=np.int64)
+    RebarX = np.concatenate(RebarX) if RebarX else np.zeros(0)
+    RebarY = np.concatenate(RebarY) if RebarY else np.zeros(0)
+    # Вычисляем площадь арматуры
+    RebarArea = (3.14 * RebarDiam**2)/4
+
+    ConcreteTags = []
+    ConcreteMat = []
+    ConcreteX = []
+    ConcreteY = []
+    ConcreteArea = []
+    for dim, tag, elemType, tags, nodes in mesh.elementBlocks:
+        if dim != 2 or tag not in ConcreteEntities:
+            continue
+        # Для элементов высокого порядка используются только угловые узлы
+        corners = mesh.NodeIndex(nodes[:, :ELEMENT_TYPES[elemType][1]])
+        X0, Y0, Elem_Area = getElementGeometry(mesh.nodeCoords[corners, 0], mesh.nodeCoords[corners, 1])
+        ConcreteTags.append(tags)
+        ConcreteMat.append(np.full(len(tags), ConcreteEntities[tag]))
+        ConcreteX.append(X0)
+        ConcreteY.append(Y0)
+        ConcreteArea.append(Elem_Area)
+
+    ConcreteTags = np.concatenate(ConcreteTags)
+    ConcreteMat = np.concatenate(ConcreteMat)
+    # Поворачиваем систему координат на 90 градусов
+    ConcreteX, ConcreteY = -np.concatenate(ConcreteY), np.concatenate(ConcreteX)
+    ConcreteArea = np.concatenate(ConcreteArea)
+    RebarX, RebarY = -RebarY, RebarX
+
+    if materials is not None:
+        return (ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY,
+                ConcreteMat, RebarMat)
+    return ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY
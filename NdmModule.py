@@ -1,46 +1,512 @@
+import time
+import warnings
 import numpy as np
-from scipy.linalg import solve
+
+
+# Число значений в рабочем массиве блока загружений NDMBatch (загружения x волокна)
+BLOCK_VALUES = 65536
+
+
+# Класс для хранения состояния решателя НДМ, используемого как начальное приближение следующего расчета
+class NDMState:
+    def __init__(self, nub, nus, X):
+        self.nub = nub  # Коэффициенты секущих модулей волокон бетона
+        self.nus = nus  # Коэффициенты секущих модулей волокон арматуры
+        self.kx = X[0]  # Кривизна 1/rx
+        self.ky = X[1]  # Кривизна 1/ry
+        self.eps0 = X[2]  # Деформация в начале координат
+
+    # Метод возвращает плоскость деформаций [1/rx, 1/ry, eps0]
+    def Plane(self):
+        return np.array([self.kx, self.ky, self.eps0], dtype=float)
+
+
+# Класс для хранения результата решения НДМ
+# Для пакета загружений атрибуты являются массивами по загружениям
+class NDMStatus:
+    def __init__(self, converged, iterations, deltaNz, deltaMx, deltaMy, message, state=None):
+        self.converged = converged  # Признак сходимости
+        self.failed = np.logical_not(converged)  # Признак отказа (превышено число итераций или расходимость)
+        self.iterations = iterations  # Количество выполненных итераций
+        self.deltaNz = deltaNz  # Относительные невязки усилий на последней итерации
+        self.deltaMx = deltaMx
+        self.deltaMy = deltaMy
+        self.message = message  # "converged", "maxiter" или "diverged"
+        self.state = state  # Состояние решателя NDMState на последней итерации
+
+
+# Функция возвращает результаты расчета (sigmab, epsb, sigmaS, epsS, status): при fullOutput = True полностью,
+# иначе без NDMStatus, а несходимость расчета (или части загружений пакета) сообщается предупреждением RuntimeWarning
+def _output(result, fullOutput):
+    if fullOutput:
+        return result
+    status = result[4]
+    if np.ndim(status.converged) == 0:
+        if not status.converged:
+            warnings.warn("NDM did not converge: %s after %d iterations" % (status.message, status.iterations),
+                          RuntimeWarning, stacklevel=3)
+    elif not np.all(status.converged):
+        warnings.warn("NDM did not converge for %d of %d load cases" % (np.count_nonzero(status.failed),
+                                                                         len(status.failed)),
+                      RuntimeWarning, stacklevel=3)
+    return result[:4]
+
+
+# Функция возвращает геометрические характеристики волокон [A*x^2, A*y^2, A*x*y, A*x, A*y, A]
+def _geometry(X, Y, Area):
+    return np.stack([Area * X**2, Area * Y**2, Area * X * Y, Area * X, Area * Y, Area], axis=-1)
+
+
+# Функция собирает матрицы жесткости 3x3 из коэффициентов [D11, D22, D12, D13, D23, D33]
+def _stiffness(D):
+    B = np.empty(D.shape[:-1] + (3, 3))
+    B[..., 0, 0] = D[..., 0]
+    B[..., 1, 1] = D[..., 1]
+    B[..., 0, 1] = B[..., 1, 0] = D[..., 2]
+    B[..., 0, 2] = B[..., 2, 0] = D[..., 3]
+    B[..., 1, 2] = B[..., 2, 1] = D[..., 4]
+    B[..., 2, 2] = D[..., 5]
+    return B
+
+
+# Функция возвращает номера волокон каждого материала (срез для непрерывной группы) со смещением offset
+# Material - номера материалов волокон (None - все волокна из одного материала), count - число материалов (диаграмм);
+# номера должны находиться в range(count). Материалы без волокон получают пустые группы. Если count не задано,
+# число материалов равно наибольшему номеру + 1
+def _materialGroups(Material, n, offset, count=None):
+    if Material is None:
+        return [slice(offset, offset + n)] + [slice(0, 0)] * ((count or 1) - 1)
+    Material = np.asarray(Material, dtype=np.int64)
+    if Material.shape != (n,):
+        raise ValueError("Material index array has %d entries for %d fibres" % (Material.size, n))
+    if n and Material.min() < 0:
+        raise ValueError("Negative material index %d" % Material.min())
+    if count is None:
+        count = int(Material.max(initial=-1)) + 1
+    elif n and Material.max() >= count:
+        raise ValueError("Material index %d is out of range(%d)" % (Material.max(), count))
+    groups = []
+    for k in range(count):
+        idx = np.flatnonzero(Material == k) + offset
+        if len(idx) == 0 or idx[-1] - idx[0] + 1 == len(idx):
+            idx = slice(idx[0], idx[-1] + 1) if len(idx) else slice(0, 0)
+        groups.append(idx)
+    return groups
+
+
+# Функция возвращает число материалов (диаграмм): длину списка диаграмм или 1 для одной диаграммы
+def getMaterialCount(funcs):
+    return len(funcs) if isinstance(funcs, (list, tuple)) else 1
+
+
+# Функция проверяет, что номера материалов волокон находятся в range(len(funcs)), и возвращает список диаграмм
+def _checkMaterials(funcs, groups):
+    if not isinstance(funcs, (list, tuple)):
+        funcs = [funcs]
+    if len(funcs) != len(groups):
+        raise ValueError("Material indices must be in range(%d) for %d diagrams, got %d materials"
+                         % (len(funcs), len(funcs), len(groups)))
+    return funcs
+
+
+# Функция вычисляет напряжения, секущие и касательные модули волокон по диаграммам материалов
+# Каждая диаграмма вычисляется один раз для всех волокон своего материала (последняя ось массива eps)
+# funcs - диаграмма или список диаграмм по номерам материалов, out - массивы (sigma, Esec, Etan)
+def _evaluate(funcs, groups, eps, out):
+    funcs = _checkMaterials(funcs, groups)
+    for func, idx in zip(funcs, groups):
+        if isinstance(idx, slice):
+            func.Evaluate(eps[..., idx], out=tuple(a[..., idx] for a in out))
+        else:
+            sigma, Esec, Etan = func.Evaluate(eps[..., idx])
+            out[0][..., idx] = sigma
+            out[1][..., idx] = Esec
+            out[2][..., idx] = Etan
+    return out
+
+
+# Функция проверяет выход деформаций волокон за предельное значение (в том числе nan и inf)
+def _strainExceeded(eps, epsLimit):
+    return not np.abs(eps).max(initial=0) <= epsLimit
+
+
+# Класс волоконного сечения для НДМ
+# При создании вычисляется матрица геометрических характеристик волокон (волокна x 6)
+# [x^2, y^2, x*y, x, y, 1]*A для бетона и арматуры, после чего сборка матрицы жесткости
+# на каждой итерации сводится к одному произведению матрицы на вектор модулей.
+# Рабочие массивы выделяются один раз и используются повторно на всех итерациях
+# ConcreteMat, RebarMat - номера материалов волокон бетона и арматуры для сечений из нескольких материалов
+# (номер материала соответствует номеру диаграммы в списке sigmab_func или sigmas_func);
+# ConcreteCount, RebarCount - число диаграмм бетона и арматуры (см. getMaterialCount), включая неиспользуемые материалы
+class NDMSection:
+    def __init__(self, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat=None, RebarMat=None,
+                 ConcreteCount=None, RebarCount=None):
+        self.nb = len(ConcreteX)
+        self.ns = len(RebarX)
+        nb = self.nb
+        self.X = np.concatenate([ConcreteX, RebarX]).astype(float)
+        self.Y = np.concatenate([ConcreteY, RebarY]).astype(float)
+        self.Area = np.concatenate([ConcreteArea, RebarArea]).astype(float)
+        self.ConcreteX, self.ConcreteY, self.ConcreteArea = self.X[:nb], self.Y[:nb], self.Area[:nb]
+        self.RebarX, self.RebarY, self.RebarArea = self.X[nb:], self.Y[nb:], self.Area[nb:]
+        # Геометрические характеристики волокон и их части для бетона и арматуры
+        self.G = _geometry(self.X, self.Y, self.Area)
+        self.Gb = self.G[:nb]
+        self.Gs = self.G[nb:]
+        # Матрица [A*x, A*y, A] для вычисления внутренних усилий [Mx, My, Nz]
+        self.GF = np.ascontiguousarray(self.G[:, 3:6])
+        # Матрица [x, y, 1] для вычисления деформаций по плоскости [1/rx, 1/ry, eps0]
+        self.P = np.stack([self.X, self.Y, np.ones(len(self.X))], axis=1)
+        # Номера волокон каждого материала бетона и арматуры
+        self.ConcreteGroups = _materialGroups(ConcreteMat, self.nb, 0, ConcreteCount)
+        self.RebarGroups = _materialGroups(RebarMat, self.ns, nb, RebarCount)
+        # Номер диаграммы каждого волокна (сначала диаграммы бетона, затем арматуры) для ядра KernelModule
+        self.Group = np.zeros(len(self.X), dtype=np.int64)
+        for k, idx in enumerate(self.ConcreteGroups + self.RebarGroups):
+            self.Group[idx] = k
+        # Рабочие массивы: деформации, напряжения, секущие и касательные модули волокон
+        n = len(self.X)
+        self.eps = np.zeros(n)
+        self.sigma = np.zeros(n)
+        self.Esec = np.zeros(n)
+        self.Etan = np.zeros(n)
+        self.D = np.zeros(6)
+        self.F = np.zeros(3)
+
+    # Метод вычисляет деформации всех волокон для плоскости X = [1/rx, 1/ry, eps0]
+    def Strains(self, X):
+        return np.dot(self.P, X, out=self.eps)
+
+    # Метод вычисляет напряжения и модули волокон по диаграммам бетона и арматуры
+    # sigmab_func, sigmas_func - диаграмма или список диаграмм по номерам материалов
+    def Stresses(self, sigmab_func, sigmas_func):
+        out = (self.sigma, self.Esec, self.Etan)
+        _evaluate(sigmab_func, self.ConcreteGroups, self.eps, out)
+        _evaluate(sigmas_func, self.RebarGroups, self.eps, out)
+        return self.sigma
+
+    # Метод возвращает начальные модули упругости волокон
+    # Eb, Es - модуль упругости или список модулей по номерам материалов бетона и арматуры
+    def Moduli(self, Eb, Es):
+        E = np.empty(len(self.X))
+        for values, groups in ((Eb, self.ConcreteGroups), (Es, self.RebarGroups)):
+            values = np.broadcast_to(np.asarray(values, dtype=float), (len(groups),))
+            for v, idx in zip(values, groups):
+                E[idx] = v
+        return E
+
+    # Метод возвращает матрицу жесткости сечения 3x3 для вектора модулей волокон E
+    def Stiffness(self, E):
+        return _stiffness(np.dot(E, self.G, out=self.D))
+
+    # Метод возвращает внутренние усилия [Mx, My, Nz] для напряжений волокон sigma
+    def Forces(self, sigma):
+        return np.dot(sigma, self.GF, out=self.F)
 
 
 # Функция нелинейной деформационной модели
-def NDM(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, deltaMN):
-    # Коэффициенты упругости
-    nub = np.ones(len(ConcreteX))
-    nus = np.ones(len(RebarX))
+# method = "secant" - итерации по секущим модулям, "newton" - метод Ньютона-Рафсона по касательной жесткости
+# maxIter - максимальное число итераций; расчет считается расходящимся, если относительная невязка превышает
+# divergence или деформации волокон по модулю превышают epsLimit. При fullOutput = True дополнительно возвращается NDMStatus,
+# иначе несходимость расчета сообщается предупреждением RuntimeWarning
+# section - заранее созданный NDMSection для повторного использования в серии расчетов
+# (в этом случае массивы координат и площадей волокон не используются)
+# state - состояние NDMState предыдущего расчета, с которого начинаются итерации (status.state при fullOutput = True)
+# monitor - объект MonitorModule.NDMMonitor для записи невязок и времени этапов расчета (None - без записи)
+# Для сечений из нескольких материалов Eb, sigmab_func (Es, sigmas_func) задаются списками по номерам материалов,
+# а ConcreteMat (RebarMat) - номерами материалов волокон (см. MshModule.getSectionInfo с параметром materials)
+# backend = "numba" - итерации по секущим модулям выполняются скомпилированным ядром KernelModule; если Numba
+# не установлена, задан monitor или диаграммы не являются DiagramModule.Diagram, используется NumPy
+def NDM(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, deltaMN,
+        method="secant", maxIter=500, divergence=1e3, epsLimit=0.1, fullOutput=False, section=None, state=None,
+        monitor=None, ConcreteMat=None, RebarMat=None, backend="numpy"):
+    if section is None:
+        section = NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat,
+                             getMaterialCount(sigmab_func), getMaterialCount(sigmas_func))
+    if backend not in ("numpy", "numba"):
+        raise ValueError("Unknown NDM backend: " + str(backend))
+    if backend == "numba" and method == "secant" and monitor is None:
+        # Модуль импортируется только по запросу, чтобы не замедлять запуск импортом Numba
+        import KernelModule
+        if KernelModule.AVAILABLE and KernelModule.supported(sigmab_func, sigmas_func):
+            result = _NDMKernel(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, section, deltaMN, maxIter, divergence,
+                                epsLimit, state)
+            return _output(result, fullOutput)
+    if method == "newton":
+        result = _NDMNewton(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, section, deltaMN, maxIter, divergence, epsLimit,
+                            state, monitor)
+        return _output(result, fullOutput)
+    if method != "secant":
+        raise ValueError("Unknown NDM method: " + str(method))
+    nb = section.nb
+    # Коэффициенты упругости: начальные секущие модули волокон равны Eb и Es или берутся из state
+    E0 = section.Moduli(Eb, Es)
+    E = section.Esec
+    E[:] = E0
+    X = np.zeros(3)
+    if state is not None:
+        E[:nb] *= state.nub
+        E[nb:] *= state.nus
+        X = state.Plane()
+    eps = section.eps
+    eps[:] = 0
+    sigma = section.sigma
+    sigma[:] = 0
     if Mx != 0: deltaMx = 1
     else: deltaMx = 0
     if My != 0: deltaMy = 1
     else: deltaMy = 0
     if Nz != 0: deltaNz = 1
     else: deltaNz = 0
-    sigmab = np.zeros(len(ConcreteX))
-    sigmaS = np.zeros(len(RebarX))
+    A = np.array([Mx, My, Nz], dtype=float)
+    iterations = 0
+    message = "converged"
+    if monitor is not None:
+        monitor.Start(Nz, Mx, My, method)
     while deltaNz >= deltaMN or deltaMx >= deltaMN or deltaMy >= deltaMN:
-        D11 = np.dot(ConcreteArea, ConcreteX**2 * nub) * Eb + np.dot(RebarArea, RebarX**2 * nus) * Es
-        D22 = np.dot(ConcreteArea, ConcreteY**2 * nub) * Eb + np.dot(RebarArea, RebarY**2 * nus) * Es
-        D12 = np.dot(ConcreteArea, ConcreteX * ConcreteY * nub) * Eb + np.dot(RebarArea, RebarX * RebarY * nus) * Es
-        D13 = np.dot(ConcreteArea, ConcreteX * nub) * Eb + np.dot(RebarArea, RebarX * nus) * Es
-        D23 = np.dot(ConcreteArea, ConcreteY * nub) * Eb + np.dot(RebarArea, RebarY * nus) * Es
-        D33 = np.dot(ConcreteArea, nub) * Eb + np.dot(RebarArea, nus) * Es
-        A = np.array([[Mx], [My], [Nz]])
-        B = np.array([[D11, D12, D13], [D12, D22, D23], [D13, D23, D33]])
-        X = solve(B, A)
-        rx = 1/X[0]
-        ry = 1/X[1]
-        eps0 = X[2]
-        epsb = eps0 + 1/rx * ConcreteX + 1/ry * ConcreteY
-        epsS = eps0 + 1/rx * RebarX + 1/ry * RebarY
-        for i in range(len(epsb)):
-            sigmab[i] = sigmab_func(epsb[i])
-            #if epsb[i] > 0: sigmab[i] = 0
-        for i in range(len(epsS)):
-            sigmaS[i] = sigmas_func(epsS[i])
-        Mxr = np.dot(sigmab * ConcreteArea, ConcreteX) + np.dot(sigmaS * RebarArea, RebarX)
-        Myr = np.dot(sigmab * ConcreteArea, ConcreteY) + np.dot(sigmaS * RebarArea, RebarY)
-        Nzr = np.dot(sigmab, ConcreteArea) + np.dot(sigmaS, RebarArea)
+        if iterations >= maxIter:
+            message = "maxiter"
+            break
+        iterations += 1
+        if monitor is not None: t0 = time.perf_counter()
+        B = section.Stiffness(E)
+        if monitor is not None: t1 = time.perf_counter()
+        X = np.linalg.solve(B, A)
+        if monitor is not None: t2 = time.perf_counter()
+        # X[0] = 1/rx, X[1] = 1/ry, X[2] = eps0
+        section.Strains(X)
+        # Напряжения и секущие модули во всех волокнах за один вызов диаграммы;
+        # секущие модули записываются в E и используются на следующей итерации
+        section.Stresses(sigmab_func, sigmas_func)
+        if monitor is not None: t3 = time.perf_counter()
+        Mxr, Myr, Nzr = section.Forces(sigma)
         if Nz != 0: deltaNz = abs((Nz - Nzr)/Nz)
         if Mx != 0: deltaMx = abs((Mx - Mxr)/Mx)
         if My != 0: deltaMy = abs((My - Myr)/My)
-        nub = sigmab / (Eb * epsb)
-        nus = sigmaS / (Es * epsS)
-    return sigmab, epsb, sigmaS, epsS
\ No newline at end of file
+        if monitor is not None:
+            monitor.Iteration(deltaNz, deltaMx, deltaMy, (t1 - t0, t2 - t1, t3 - t2, time.perf_counter() - t3))
+        if max(deltaNz, deltaMx, deltaMy) > divergence or _strainExceeded(eps, epsLimit):
+            message = "diverged"
+            break
+    sigmab, epsb, sigmaS, epsS = sigma[:nb].copy(), eps[:nb].copy(), sigma[nb:].copy(), eps[nb:].copy()
+    if monitor is not None:
+        monitor.Finish(message == "converged", message)
+    state = NDMState(E[:nb] / E0[:nb], E[nb:] / E0[nb:], X) if fullOutput else None
+    status = NDMStatus(message == "converged", iterations, deltaNz, deltaMx, deltaMy, message, state)
+    return _output((sigmab, epsb, sigmaS, epsS, status), fullOutput)
+
+
+# Итерации по секущим модулям скомпилированным ядром KernelModule.secant (результат аналогичен функции NDM)
+def _NDMKernel(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, section, deltaMN, maxIter, divergence, epsLimit, state):
+    import KernelModule
+    nb = section.nb
+    funcs = _checkMaterials(sigmab_func, section.ConcreteGroups) + _checkMaterials(sigmas_func, section.RebarGroups)
+    # Начальные модули волокон по номерам диаграмм
+    Egroup = np.concatenate([np.broadcast_to(np.asarray(Eb, dtype=float), (len(section.ConcreteGroups),)),
+                             np.broadcast_to(np.asarray(Es, dtype=float), (len(section.RebarGroups),))])
+    E0 = Egroup[section.Group]
+    E = section.Esec
+    E[:] = E0
+    X = np.zeros(3)
+    if state is not None:
+        E[:nb] *= state.nub
+        E[nb:] *= state.nus
+        X = state.Plane()
+    dEps, dSigma, dSlope, dStart, dEnd = KernelModule.diagramTables(funcs)
+    eps = section.eps
+    sigma = section.sigma
+    eps[:] = 0
+    sigma[:] = 0
+    iterations, code, deltaNz, deltaMx, deltaMy = KernelModule.secant(
+        section.X, section.Y, section.Area, section.Group, dEps, dSigma, dSlope, dStart, dEnd, E,
+        float(Nz), float(Mx), float(My), float(deltaMN), int(maxIter), float(divergence), float(epsLimit), eps, sigma, X)
+    message = ("converged", "maxiter", "diverged")[code]
+    state = NDMState(E[:nb] / E0[:nb], E[nb:] / E0[nb:], X)
+    status = NDMStatus(code == 0, iterations, deltaNz, deltaMx, deltaMy, message, state)
+    return sigma[:nb].copy(), eps[:nb].copy(), sigma[nb:].copy(), eps[nb:].copy(), status
+
+
+# Метод Ньютона-Рафсона с касательной жесткостью сечения и линейным поиском шага
+def _NDMNewton(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, section, deltaMN, maxIter, divergence, epsLimit, state,
+               monitor):
+    nb = section.nb
+    absGF = np.abs(section.GF)
+    Target = np.array([Mx, My, Nz], dtype=float)
+
+    # Функция вычисляет состояние сечения в рабочих массивах section и возвращает невязки [Mx, My, Nz]
+    # для плоскости деформаций X. Для нулевых усилий невязка относится к сумме модулей внутренних усилий по волокнам
+    def residual(X):
+        section.Strains(X)
+        section.Stresses(sigmab_func, sigmas_func)
+        R = Target - section.Forces(section.sigma)
+        Scale = np.where(Target != 0, np.abs(Target), np.abs(section.sigma) @ absGF)
+        delta = np.divide(np.abs(R), Scale, out=np.zeros(3), where=Scale != 0)
+        return R, delta
+
+    X = np.zeros(3) if state is None else state.Plane()
+    R, delta = residual(X)
+    iterations = 0
+    stalled = 0
+    message = "converged"
+    if monitor is not None:
+        monitor.Start(Nz, Mx, My, "newton")
+    while np.any(delta >= deltaMN):
+        if iterations >= maxIter:
+            message = "maxiter"
+            break
+        iterations += 1
+        # Касательная жесткость сечения; при ее вырождении (вершина диаграммы) используется секущая жесткость
+        # Время сборки и решения системы учитывается вместе (этап "solve"), время линейного поиска - в этапе "material"
+        if monitor is not None: t0 = time.perf_counter()
+        try:
+            dX = np.linalg.solve(section.Stiffness(section.Etan), R)
+        except np.linalg.LinAlgError:
+            dX = np.full(3, np.nan)
+        if not np.all(np.isfinite(dX)):
+            dX = np.linalg.solve(section.Stiffness(section.Esec), R)
+        if monitor is not None: t1 = time.perf_counter()
+        # Линейный поиск: шаг уменьшается вдвое, пока норма невязки не начнет убывать
+        norm = np.linalg.norm(delta)
+        # (X остается в последней вычисленной точке, чтобы состояние section соответствовало плоскости X)
+        alpha = 1.0
+        for k in range(8):
+            if k:
+                alpha *= 0.5
+            R, delta = residual(X + alpha * dX)
+            if np.linalg.norm(delta) < (1 - 1e-4 * alpha) * norm:
+                stalled = 0
+                break
+        else:
+            stalled += 1
+        X = X + alpha * dX
+        if monitor is not None:
+            monitor.Iteration(delta[2], delta[0], delta[1], (0.0, t1 - t0, time.perf_counter() - t1, 0.0))
+        # Расчет прекращается, если невязка не убывает на протяжении 10 итераций подряд
+        if (not np.all(np.isfinite(delta)) or delta.max() > divergence or stalled >= 10
+                or _strainExceeded(section.eps, epsLimit)):
+            message = "diverged"
+            break
+    eps = section.eps
+    sigma = section.sigma
+    if monitor is not None:
+        monitor.Finish(message == "converged", message)
+    E0 = section.Moduli(Eb, Es)
+    state = NDMState(section.Esec[:nb] / E0[:nb], section.Esec[nb:] / E0[nb:], X)
+    status = NDMStatus(message == "converged", iterations, delta[2], delta[0], delta[1], message, state)
+    return sigma[:nb].copy(), eps[:nb].copy(), sigma[nb:].copy(), eps[nb:].copy(), status
+
+
+# Функция нелинейной деформационной модели для пакета загружений
+# Nz, Mx, My - массивы усилий; загружения делятся на блоки по blockSize загружений (по умолчанию - около BLOCK_VALUES
+# значений в массиве блока, чтобы рабочие массивы помещались в кэш процессора), загружения блока итерируются
+# одновременно матрицами (загружения x волокна). Рабочие массивы блока выделяются один раз; сошедшиеся и отказавшие
+# загружения записываются в результаты и исключаются сдвигом оставшихся строк к началу рабочих массивов
+# Параметры maxIter, divergence, epsLimit, fullOutput, section, ConcreteMat и RebarMat аналогичны функции NDM
+def NDMBatch(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, deltaMN,
+             maxIter=500, divergence=1e3, epsLimit=0.1, fullOutput=False, section=None, ConcreteMat=None, RebarMat=None,
+             blockSize=None):
+    Nz, Mx, My = np.broadcast_arrays(np.atleast_1d(np.asarray(Nz, dtype=float)),
+                                     np.asarray(Mx, dtype=float), np.asarray(My, dtype=float))
+    Loads = np.stack([Mx, My, Nz], axis=1)
+    nCases = len(Loads)
+    if section is None:
+        section = NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat,
+                             getMaterialCount(sigmab_func), getMaterialCount(sigmas_func))
+    nb = section.nb
+    nFibres = section.nb + section.ns
+    E0 = section.Moduli(Eb, Es)
+    PT = np.ascontiguousarray(section.P.T)
+    sigma = np.zeros((nCases, nFibres))
+    eps = np.zeros((nCases, nFibres))
+    iterations = np.zeros(nCases, dtype=int)
+    delta = np.where(Loads != 0, 1.0, 0.0)
+    # Загружения с ненулевыми усилиями; нулевым соответствуют нулевые напряжения и деформации
+    loaded = np.any(Loads != 0, axis=1)
+    cases = np.flatnonzero(loaded)
+    message = np.where(loaded, "maxiter", "converged").astype(object)
+    if blockSize is None:
+        blockSize = max(BLOCK_VALUES // max(nFibres, 1), 1)
+    blockSize = min(blockSize, max(len(cases), 1))
+    # Рабочие массивы блока: секущие модули, деформации, напряжения и касательные модули волокон
+    Ew = np.empty((blockSize, nFibres))
+    epsw = np.empty((blockSize, nFibres))
+    sigmaw = np.empty((blockSize, nFibres))
+    Etanw = np.empty((blockSize, nFibres))
+    for start in range(0, len(cases), blockSize):
+        idx = cases[start:start + blockSize]
+        m = len(idx)
+        Target = Loads[idx]
+        Ew[:m] = E0
+        for it in range(1, maxIter + 1):
+            E, e, s = Ew[:m], epsw[:m], sigmaw[:m]
+            Plane = np.linalg.solve(_stiffness(E @ section.G), Target[:, :, None])[:, :, 0]
+            # Plane[:, 0] = 1/rx, Plane[:, 1] = 1/ry, Plane[:, 2] = eps0
+            np.matmul(Plane, PT, out=e)
+            # Напряжения и секущие модули (сразу в массив модулей): одно вычисление каждой диаграммы на блок
+            out = (s, E, Etanw[:m])
+            _evaluate(sigmab_func, section.ConcreteGroups, e, out)
+            _evaluate(sigmas_func, section.RebarGroups, e, out)
+            # Относительные невязки внутренних усилий [Mx, My, Nz]
+            nonzero = Target != 0
+            d = np.abs(Target - s @ section.GF) / np.where(nonzero, np.abs(Target), 1)
+            d[~nonzero] = 0
+            converged = np.all(d < deltaMN, axis=1)
+            diverged = ~converged & ~((d.max(axis=1) <= divergence) & (np.abs(e).max(axis=1, initial=0) <= epsLimit))
+            done = converged | diverged if it < maxIter else np.ones(m, dtype=bool)
+            if not done.any():
+                continue
+            # Запись завершенных загружений в результаты
+            fin = idx[done]
+            sigma[fin] = s[done]
+            eps[fin] = e[done]
+            iterations[fin] = it
+            delta[fin] = d[done]
+            message[fin] = np.where(converged[done], "converged", np.where(diverged[done], "diverged", "maxiter"))
+            # Сдвиг оставшихся загружений к началу рабочих массивов
+            keep = ~done
+            m = np.count_nonzero(keep)
+            if m == 0:
+                break
+            Ew[:m] = E[keep]
+            idx = idx[keep]
+            Target = Target[keep]
+    status = NDMStatus(message == "converged", iterations, delta[:, 2], delta[:, 0], delta[:, 1], message)
+    return _output((sigma[:, :nb], eps[:, :nb], sigma[:, nb:], eps[:, nb:], status), fullOutput)
+
+
+# Функция последовательного расчета серии загружений с продолжением по состоянию решателя
+# Каждый расчет начинается с состояния, полученного в последнем сошедшемся расчете, поэтому загружения
+# следует упорядочить вдоль пути нагружения. Возвращает массивы (загружения x волокна) и NDMStatus
+# с массивами по загружениям; параметры kwargs передаются в функцию NDM
+def NDMSequence(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                deltaMN, state=None, **kwargs):
+    Nz, Mx, My = np.broadcast_arrays(np.atleast_1d(np.asarray(Nz, dtype=float)),
+                                     np.asarray(Mx, dtype=float), np.asarray(My, dtype=float))
+    nCases = len(Nz)
+    section = kwargs.pop("section", None)
+    ConcreteMat = kwargs.pop("ConcreteMat", None)
+    RebarMat = kwargs.pop("RebarMat", None)
+    if section is None:
+        section = NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat,
+                             getMaterialCount(sigmab_func), getMaterialCount(sigmas_func))
+    sigmab = np.zeros((nCases, section.nb))
+    epsb = np.zeros((nCases, section.nb))
+    sigmaS = np.zeros((nCases, section.ns))
+    epsS = np.zeros((nCases, section.ns))
+    converged = np.zeros(nCases, dtype=bool)
+    iterations = np.zeros(nCases, dtype=int)
+    delta = np.zeros((nCases, 3))
+    message = np.empty(nCases, dtype=object)
+    for k in range(nCases):
+        sigmab[k], epsb[k], sigmaS[k], epsS[k], status = NDM(Nz[k], Mx[k], My[k], Eb, sigmab_func, Es, sigmas_func,
+                                                             None, None, None, None, None, None, deltaMN,
+                                                             fullOutput=True, section=section, state=state, **kwargs)
+        converged[k] = status.converged
+        iterations[k] = status.iterations
+        delta[k] = status.deltaNz, status.deltaMx, status.deltaMy
+        message[k] = status.message
+        # Несошедшийся расчет не используется как начальное приближение
+        if status.converged:
+            state = status.state
+    status = NDMStatus(converged, iterations, delta[:, 0], delta[:, 1], delta[:, 2], message, state)
+    return sigmab, epsb, sigmaS, epsS, status
@@ -0,0 +1,166 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import NdmModule
+
+
+# Данные процесса-исполнителя: сечение, диаграммы, параметры расчета и массивы результатов
+_WORKER = {}
+
+
+# Функция создает массив в разделяемой памяти с копией данных a
+# Возвращает блок разделяемой памяти и описание массива (имя, форма, тип) для подключения в других процессах
+def _share(a):
+    a = np.ascontiguousarray(a)
+    shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+    np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+    return shm, (shm.name, a.shape, a.dtype.str)
+
+
+# Функция подключает массив разделяемой памяти по описанию (имя, форма, тип)
+# Готовые массивы (расчет в текущем процессе) возвращаются без изменений
+def _attach(spec, blocks):
+    if spec is None or isinstance(spec, np.ndarray):
+        return spec
+    name, shape, dtype = spec
+    # Блок удаляет процесс, который его создал; процессы пула используют общий с ним resource_tracker
+    shm = shared_memory.SharedMemory(name=name)
+    blocks.append(shm)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+# Функция возвращает число ядер, доступных процессу (с учетом ограничений affinity и cgroup cpuset)
+def _cpuCount():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Инициализация процесса-исполнителя: подключение массивов сечения, создание NDMSection
+# Сечение создается один раз на процесс и используется для всех загружений, переданных процессу.
+# outputs - массивы результатов (расчет в текущем процессе) или None (результаты возвращаются по частям)
+def _initWorker(inputs, outputs, diagrams, deltaMN, kwargs):
+    blocks = []
+    ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat = [_attach(s, blocks) for s in inputs]
+    _WORKER.clear()
+    _WORKER["blocks"] = blocks
+    _WORKER["section"] = NdmModule.NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                                              ConcreteMat, RebarMat, NdmModule.getMaterialCount(diagrams[1]),
+                                              NdmModule.getMaterialCount(diagrams[3]))
+    _WORKER["sigma"], _WORKER["eps"] = outputs if outputs is not None else (None, None)
+    _WORKER["diagrams"] = diagrams
+    _WORKER["deltaMN"] = deltaMN
+    _WORKER["kwargs"] = kwargs
+
+
+# Расчет части загружений, начиная с номера start; возвращаются признаки сходимости, числа итераций, невязки,
+# сообщения решателя, а также напряжения и деформации части (загружения x волокна). При расчете в текущем процессе
+# результаты записываются прямо в массивы результатов, и вместо массивов части возвращается None
+def _solveChunk(start, Nz, Mx, My):
+    section = _WORKER["section"]
+    Eb, sigmab_func, Es, sigmas_func = _WORKER["diagrams"]
+    sigma = _WORKER["sigma"]
+    eps = _WORKER["eps"]
+    nb = section.nb
+    n = len(Nz)
+    local = sigma is None
+    if local:
+        sigma = np.empty((n, section.nb + section.ns))
+        eps = np.empty((n, section.nb + section.ns))
+        start = 0
+    converged = np.zeros(n, dtype=bool)
+    iterations = np.zeros(n, dtype=int)
+    delta = np.zeros((n, 3))
+    message = np.empty(n, dtype=object)
+    for k in range(n):
+        sigmab, epsb, sigmaS, epsS, status = NdmModule.NDM(Nz[k], Mx[k], My[k], Eb, sigmab_func, Es, sigmas_func,
+                                                           None, None, None, None, None, None, _WORKER["deltaMN"],
+                                                           fullOutput=True, section=section, **_WORKER["kwargs"])
+        sigma[start + k, :nb] = sigmab
+        sigma[start + k, nb:] = sigmaS
+        eps[start + k, :nb] = epsb
+        eps[start + k, nb:] = epsS
+        converged[k] = status.converged
+        iterations[k] = status.iterations
+        delta[k] = status.deltaNz, status.deltaMx, status.deltaMy
+        message[k] = status.message
+    if local:
+        return converged, iterations, delta, message, sigma, eps
+    return converged, iterations, delta, message, None, None
+
+
+# Функция параллельного расчета пакета загружений по НДМ
+# Массивы волокон сечения размещаются в разделяемой памяти один раз; загружения делятся на части по chunkSize
+# загружений и распределяются по workers процессам (по умолчанию - по числу доступных процессу ядер).
+# Каждый процесс создает NDMSection один раз; напряжения и деформации каждой части по мере готовности
+# записываются в массивы результатов out = (sigma, eps) размером (загружения x волокна), поэтому, кроме них,
+# в памяти находятся только рассчитываемые части. out можно передать заранее созданными (например, np.memmap),
+# иначе массивы создаются функцией. Параметры kwargs (method, maxIter и др.) передаются в функцию NDM.
+# При fullOutput = True дополнительно возвращается NDMStatus с массивами по загружениям
+def NDMParallel(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                deltaMN, workers=None, chunkSize=None, fullOutput=False, ConcreteMat=None, RebarMat=None, out=None,
+                **kwargs):
+    Nz, Mx, My = np.broadcast_arrays(np.atleast_1d(np.asarray(Nz, dtype=float)),
+                                     np.asarray(Mx, dtype=float), np.asarray(My, dtype=float))
+    nCases = len(Nz)
+    nb = len(ConcreteX)
+    nFibres = nb + len(RebarX)
+    if workers is None:
+        workers = _cpuCount()
+    workers = max(min(workers, nCases), 1)
+    if chunkSize is None:
+        # Несколько частей на процесс для выравнивания нагрузки
+        chunkSize = max(int(np.ceil(nCases / (workers * 4))), 1)
+    starts = list(range(0, nCases, chunkSize))
+    diagrams = (Eb, sigmab_func, Es, sigmas_func)
+    if out is None:
+        sigma = np.empty((nCases, nFibres))
+        eps = np.empty((nCases, nFibres))
+    else:
+        sigma, eps = out
+        if sigma.shape != (nCases, nFibres) or eps.shape != (nCases, nFibres):
+            raise ValueError("Output arrays must have shape (%d, %d)" % (nCases, nFibres))
+
+    inputs = [None if a is None else np.asarray(a, dtype=np.int64 if i >= 6 else float)
+              for i, a in enumerate((ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, ConcreteMat, RebarMat))]
+    converged = np.zeros(nCases, dtype=bool)
+    iterations = np.zeros(nCases, dtype=int)
+    delta = np.zeros((nCases, 3))
+    message = np.empty(nCases, dtype=object)
+    blocks = []
+    try:
+        if workers > 1:
+            inputSpecs = []
+            for a in inputs:
+                if a is None:
+                    inputSpecs.append(None)
+                else:
+                    shm, spec = _share(a)
+                    blocks.append(shm)
+                    inputSpecs.append(spec)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                     initargs=(inputSpecs, None, diagrams, deltaMN, kwargs)) as pool:
+                parts = pool.map(_solveChunk, starts, *zip(*[(Nz[s:s + chunkSize], Mx[s:s + chunkSize], My[s:s + chunkSize])
+                                                              for s in starts]))
+                # Результаты частей поступают в порядке загружений и сразу переносятся в массивы результатов
+                for s, (c, it, d, m, sigmaPart, epsPart) in zip(starts, parts):
+                    converged[s:s + len(c)] = c
+                    iterations[s:s + len(c)] = it
+                    delta[s:s + len(c)] = d
+                    message[s:s + len(c)] = m
+                    sigma[s:s + len(c)] = sigmaPart
+                    eps[s:s + len(c)] = epsPart
+        else:
+            _initWorker(inputs, (sigma, eps), diagrams, deltaMN, kwargs)
+            converged[:], iterations[:], delta[:], message[:] = _solveChunk(0, Nz, Mx, My)[:4]
+            _WORKER.clear()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    sigmab, epsb, sigmaS, epsS = sigma[:, :nb], eps[:, :nb], sigma[:, nb:], eps[:, nb:]
+    if fullOutput:
+        status = NdmModule.NDMStatus(converged, iterations, delta[:, 0], delta[:, 1], delta[:, 2], message)
+        return sigmab, epsb, sigmaS, epsS, status
+    return sigmab, epsb, sigmaS, epsS
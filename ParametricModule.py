@@ -0,0 +1,99 @@
+import numpy as np
+
+
+# Параметрические сечения без использования gmsh
+# Функции возвращают массивы в том же порядке, что и SectionModule.getSectionInfo:
+# ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY
+# Ось X направлена вдоль ширины сечения, ось Y - вдоль высоты, начало координат - в центре тяжести
+# бетонного сечения. cover - расстояние от грани сечения до центра стержня, size - размер волокна, м
+
+
+# Функция возвращает волокна прямоугольника [x0, x1] x [y0, y1] (сетка волокон размером не более size)
+def _rectangleFibres(x0, x1, y0, y1, size):
+    nx = max(int(np.ceil((x1 - x0) / size - 1e-9)), 1)
+    ny = max(int(np.ceil((y1 - y0) / size - 1e-9)), 1)
+    X, Y = np.meshgrid(x0 + (np.arange(nx) + 0.5) * (x1 - x0) / nx, y0 + (np.arange(ny) + 0.5) * (y1 - y0) / ny)
+    return X.ravel(), Y.ravel(), np.full(nx * ny, (x1 - x0) * (y1 - y0) / (nx * ny))
+
+
+# Функция возвращает n стержней, равномерно расположенных на отрезке от (x0, y0) до (x1, y1)
+def _barsLine(x0, y0, x1, y1, n):
+    t = np.linspace(0, 1, n) if n > 1 else np.full(n, 0.5)
+    return x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+
+
+# Функция собирает массивы сечения из списков волокон бетона и стержней и переносит начало координат
+# в центр тяжести бетонного сечения
+def _section(fibres, bars):
+    ConcreteX = np.concatenate([f[0] for f in fibres])
+    ConcreteY = np.concatenate([f[1] for f in fibres])
+    ConcreteArea = np.concatenate([f[2] for f in fibres])
+    RebarX = np.concatenate([b[0] for b in bars]) if bars else np.zeros(0)
+    RebarY = np.concatenate([b[1] for b in bars]) if bars else np.zeros(0)
+    RebarDiam = np.concatenate([np.full(len(b[0]), b[2], dtype=float) for b in bars]) if bars else np.zeros(0)
+    A = ConcreteArea.sum()
+    x0 = np.dot(ConcreteArea, ConcreteX) / A
+    y0 = np.dot(ConcreteArea, ConcreteY) / A
+    ConcreteTags = np.arange(1, len(ConcreteX) + 1, dtype=np.uint64)
+    RebarTags = np.arange(1, len(RebarX) + 1, dtype=np.uint64)
+    # Площадь арматуры вычисляется так же, как при импорте сечения из файла сетки
+    RebarArea = (3.14 * RebarDiam**2)/4
+    return (ConcreteTags, ConcreteX - x0, ConcreteY - y0, ConcreteArea,
+            RebarTags, RebarDiam, RebarArea, RebarX - x0, RebarY - y0)
+
+
+# Прямоугольное сечение b x h со стержнями диаметром diam по контуру:
+# nx стержней вдоль нижней и верхней граней, ny стержней вдоль боковых граней (с учетом угловых)
+def rectangleSection(b, h, cover, diam, nx=2, ny=2, size=0.01):
+    fibres = [_rectangleFibres(-b / 2, b / 2, -h / 2, h / 2, size)]
+    xa = b / 2 - cover
+    ya = h / 2 - cover
+    bars = [_barsLine(-xa, -ya, xa, -ya, nx) + (diam,), _barsLine(-xa, ya, xa, ya, nx) + (diam,)]
+    if ny > 2:
+        Y = _barsLine(0, -ya, 0, ya, ny)[1][1:-1]
+        bars += [(np.full(ny - 2, -xa), Y, diam), (np.full(ny - 2, xa), Y, diam)]
+    return _section(fibres, bars)
+
+
+# Тавровое сечение: полка bf x hf сверху, ребро шириной bw, полная высота h
+# n стержней диаметром diam в нижнем ряду ребра, nTop стержней диаметром diamTop в полке
+def teeSection(bf, hf, bw, h, cover, diam, n=2, nTop=0, diamTop=None, size=0.01):
+    return iSection(bf, hf, bw, h, bw, 0, cover, diam, n, nTop, diamTop, size)
+
+
+# Двутавровое сечение: верхняя полка bf x hf, нижняя полка bf2 x hf2, стенка шириной bw, полная высота h
+# n стержней диаметром diam в нижнем ряду, nTop стержней диаметром diamTop в верхнем ряду
+def iSection(bf, hf, bw, h, bf2, hf2, cover, diam, n=2, nTop=0, diamTop=None, size=0.01):
+    fibres = [_rectangleFibres(-bw / 2, bw / 2, hf2, h - hf, size),
+              _rectangleFibres(-bf / 2, bf / 2, h - hf, h, size)]
+    if hf2 > 0:
+        fibres.append(_rectangleFibres(-bf2 / 2, bf2 / 2, 0, hf2, size))
+    # Нижние стержни располагаются по ширине нижней полки (или стенки, если полки нет)
+    xa = max(bf2 if hf2 > 0 else bw, bw) / 2 - cover
+    bars = [_barsLine(-xa, cover, xa, cover, n) + (diam,)]
+    if nTop > 0:
+        xa = bf / 2 - cover
+        bars.append(_barsLine(-xa, h - cover, xa, h - cover, nTop) + (diam if diamTop is None else diamTop,))
+    return _section(fibres, bars)
+
+
+# Круглое сечение диаметром D с n стержнями диаметром diam, равномерно расположенными по окружности
+# Волокна - секторы колец шириной около size; центры тяжести секторов вычисляются точно
+def circleSection(D, cover, diam, n=8, size=0.01):
+    R = D / 2
+    nr = max(int(np.ceil(R / size - 1e-9)), 1)
+    r = np.linspace(0, R, nr + 1)
+    r1, r2 = r[:-1], r[1:]
+    # Число секторов в кольце: длина дуги по средней линии кольца около size
+    ns = np.maximum(np.ceil(np.pi * (r1 + r2) / size - 1e-9).astype(int), 1)
+    ring = np.repeat(np.arange(nr), ns)
+    k = np.arange(len(ring)) - np.repeat(np.cumsum(ns) - ns, ns)
+    dphi = 2 * np.pi / ns[ring]
+    phi = (k + 0.5) * dphi
+    a1, a2 = r1[ring], r2[ring]
+    # Центр тяжести кольцевого сектора с углом раствора dphi
+    rc = 2 / 3 * (a2**3 - a1**3) / (a2**2 - a1**2) * np.sin(dphi / 2) / (dphi / 2)
+    fibres = [(rc * np.cos(phi), rc * np.sin(phi), dphi / 2 * (a2**2 - a1**2))]
+    phi = np.arange(n) * 2 * np.pi / n
+    bars = [((R - cover) * np.cos(phi), (R - cover) * np.sin(phi), diam)] if n > 0 else []
+    return _section(fibres, bars)
@@ -1,7 +1,7 @@
-import gmsh
 import sys
 import ConcreteModule
 import RebarModule
+import MshModule
 import SectionModule
 import NdmModule
 
@@ -18,8 +18,11 @@ deltaMN = 0.001  # Параметр сходимости
 sigmab_func = ConcreteModule.KarpenkoTemp(ConcreteMaterial, 20, 1).Design()
 sigmas_func = RebarModule.Rebar2L(RebarMaterial).Design()
 
-# Импорт сечения
-ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY = SectionModule.getSectionInfo("Primer10SP52.msh")
+# Импорт сечения: в пакетном режиме (ключ -nopopup) сетка читается без gmsh
+if '-nopopup' in sys.argv:
+    ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY = MshModule.getSectionInfo("Primer10SP52.msh")
+else:
+    ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY = SectionModule.getSectionInfo("Primer10SP52.msh")
 
 # Вычисляем координаты элементов относительно заданной системы координат
 ConcreteX, ConcreteY, RebarX, RebarY = SectionModule.getXY(-0.04, 0.06, ConcreteX, ConcreteY, RebarX, RebarY)
@@ -28,77 +31,79 @@ ConcreteX, ConcreteY, RebarX, RebarY = SectionModule.getXY(-0.04, 0.06, Concrete
 sigmab, epsb, sigmaS,epsS = NdmModule.NDM(Nz, Mx, My, ConcreteMaterial.Eb, sigmab_func, RebarMaterial.Es, sigmas_func, ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, deltaMN)
 
 
-# Добавление данных в постпроцессор
-t = [0, 0, 0, 0, 0, 0, 0, 0]
-
-t[0] = gmsh.view.add("Areas")
-gmsh.view.addHomogeneousModelData(
-    t[0], 0, gmsh.model.getCurrent(), "ElementData",
-    ConcreteTags,  # tags of elements
-    ConcreteArea)  # data, per element
-
-t[1] = gmsh.view.add("X coordinates of elements")
-gmsh.view.addHomogeneousModelData(
-    t[1], 0, gmsh.model.getCurrent(), "ElementData",
-    ConcreteTags,  # tags of elements
-    ConcreteX)  # data, per element
-
-t[2] = gmsh.view.add("Y coordinates of elements")
-gmsh.view.addHomogeneousModelData(
-    t[2], 0, gmsh.model.getCurrent(), "ElementData",
-    ConcreteTags,  # tags of elements
-    ConcreteY)  # data, per element
-
-t[3] = gmsh.view.add("Rebar diameters")
-gmsh.view.addHomogeneousModelData(
-    t[3], 0, gmsh.model.getCurrent(), "NodeData",
-    RebarTags,  # tags of nodes
-    RebarDiam)  # data, per node
-
-t[4] = gmsh.view.add("Напряжения в бетоне")
-gmsh.view.addHomogeneousModelData(
-    t[4], 0, gmsh.model.getCurrent(), "ElementData",
-    ConcreteTags,  # tags of elements
-    sigmab)  # data, per element
-
-t[5] = gmsh.view.add("Относительные деформации в бетоне")
-gmsh.view.addHomogeneousModelData(
-    t[5], 0, gmsh.model.getCurrent(), "ElementData",
-    ConcreteTags,  # tags of elements
-    epsb)  # data, per element
-
-t[6] = gmsh.view.add("Напряжения в арматуре")
-gmsh.view.addHomogeneousModelData(
-    t[6], 0, gmsh.model.getCurrent(), "NodeData",
-    RebarTags,  # tags of nodes
-    sigmaS)  # data, per element
-
-t[7] = gmsh.view.add("Относительные деформации в арматуре")
-gmsh.view.addHomogeneousModelData(
-    t[7], 0, gmsh.model.getCurrent(), "NodeData",
-    RebarTags,  # tags of nodes
-    epsS)  # data, per element
-
-gmsh.view.option.setNumber(t[6], "ShowScale", 0)
-gmsh.view.option.setNumber(t[7], "ShowScale", 0)
-gmsh.view.option.setNumber(t[3], "ShowScale", 0)
-
-gmsh.view.option.setNumber(t[6], "IntervalsType", 4)
-gmsh.view.option.setNumber(t[7], "IntervalsType", 4)
-gmsh.view.option.setNumber(t[3], "IntervalsType", 4)
-
-gmsh.view.option.setNumber(t[6], "ScaleType", 2)
-gmsh.view.option.setNumber(t[7], "ScaleType", 2)
-gmsh.view.option.setNumber(t[3], "ScaleType", 2)
-
-for i in range(8):
-    gmsh.view.option.setNumber(t[i], "Visible", 0)
-
-
-# Визуализация gmsh
+# Добавление данных в постпроцессор и визуализация выполняются только при работе с графическим интерфейсом
 if '-nopopup' not in sys.argv:
+    import gmsh
+    # Добавление данных в постпроцессор
+    t = [0, 0, 0, 0, 0, 0, 0, 0]
+
+    t[0] = gmsh.view.add("Areas")
+    gmsh.view.addHomogeneousModelData(
+        t[0], 0, gmsh.model.getCurrent(), "ElementData",
+        ConcreteTags,  # tags of elements
+        ConcreteArea)  # data, per element
+
+    t[1] = gmsh.view.add("X coordinates of elements")
+    gmsh.view.addHomogeneousModelData(
+        t[1], 0, gmsh.model.getCurrent(), "ElementData",
+        ConcreteTags,  # tags of elements
+        ConcreteX)  # data, per element
+
+    t[2] = gmsh.view.add("Y coordinates of elements")
+    gmsh.view.addHomogeneousModelData(
+        t[2], 0, gmsh.model.getCurrent(), "ElementData",
+        ConcreteTags,  # tags of elements
+        ConcreteY)  # data, per element
+
+    t[3] = gmsh.view.add("Rebar diameters")
+    gmsh.view.addHomogeneousModelData(
+        t[3], 0, gmsh.model.getCurrent(), "NodeData",
+        RebarTags,  # tags of nodes
+        RebarDiam)  # data, per node
+
+    t[4] = gmsh.view.add("Напряжения в бетоне")
+    gmsh.view.addHomogeneousModelData(
+        t[4], 0, gmsh.model.getCurrent(), "ElementData",
+        ConcreteTags,  # tags of elements
+        sigmab)  # data, per element
+
+    t[5] = gmsh.view.add("Относительные деформации в бетоне")
+    gmsh.view.addHomogeneousModelData(
+        t[5], 0, gmsh.model.getCurrent(), "ElementData",
+        ConcreteTags,  # tags of elements
+        epsb)  # data, per element
+
+    t[6] = gmsh.view.add("Напряжения в арматуре")
+    gmsh.view.addHomogeneousModelData(
+        t[6], 0, gmsh.model.getCurrent(), "NodeData",
+        RebarTags,  # tags of nodes
+        sigmaS)  # data, per element
+
+    t[7] = gmsh.view.add("Относительные деформации в арматуре")
+    gmsh.view.addHomogeneousModelData(
+        t[7], 0, gmsh.model.getCurrent(), "NodeData",
+        RebarTags,  # tags of nodes
+        epsS)  # data, per element
+
+    gmsh.view.option.setNumber(t[6], "ShowScale", 0)
+    gmsh.view.option.setNumber(t[7], "ShowScale", 0)
+    gmsh.view.option.setNumber(t[3], "ShowScale", 0)
+
+    gmsh.view.option.setNumber(t[6], "IntervalsType", 4)
+    gmsh.view.option.setNumber(t[7], "IntervalsType", 4)
+    gmsh.view.option.setNumber(t[3], "IntervalsType", 4)
+
+    gmsh.view.option.setNumber(t[6], "ScaleType", 2)
+    gmsh.view.option.setNumber(t[7], "ScaleType", 2)
+    gmsh.view.option.setNumber(t[3], "ScaleType", 2)
+
+    for i in range(8):
+        gmsh.view.option.setNumber(t[i], "Visible", 0)
+
+
+    # Визуализация gmsh
     gmsh.fltk.run()
 
 
-# Закрытие gmsh
-gmsh.finalize()
\ No newline at end of file
+    # Закрытие gmsh
+    gmsh.finalize()
@@ -1,5 +1,4 @@
-import numpy as np
-from scipy import interpolate
+import DiagramModule
 
 
 # Класс для задания физико-механических характеристик арматуры
@@ -25,7 +24,7 @@ class Rebar2L:
         eps_s2 = 0.025
         sigma_s = [-Rsn, -Rsn, 0, Rsn, Rsn]
         eps_s = [-eps_s2 * 5, -eps_s0, 0, eps_s0, eps_s2 * 5]
-        sigma_s1 = interpolate.interp1d(eps_s, sigma_s, fill_value='extrapolate')
+        sigma_s1 = DiagramModule.Diagram(eps_s, sigma_s)
         return sigma_s1
     
     # Метод для получения расчетной диаграммы
@@ -36,7 +35,7 @@ class Rebar2L:
         eps_s2 = 0.025
         sigma_s = [-Rs, -Rs, 0, Rs, Rs]
         eps_s = [-eps_s2 * 5, -eps_s0, 0, eps_s0, eps_s2 * 5]
-        sigma_s1 = interpolate.interp1d(eps_s, sigma_s, fill_value='extrapolate')
+        sigma_s1 = DiagramModule.Diagram(eps_s, sigma_s)
         return sigma_s1
 
 
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+# Вершины равностороннего треугольника, для которых сумма z*z^T равна 3*I
+_TRIANGLE = np.sqrt(2) * np.array([[np.cos(a), np.sin(a)] for a in (0, 2 * np.pi / 3, 4 * np.pi / 3)])
+
+
+# Функция заменяет группу волокон тремя волокнами равной площади с тем же
+# центром тяжести и теми же центральными моментами инерции
+def _lump(X, Y, Area):
+    A = Area.sum()
+    cx = np.dot(Area, X) / A
+    cy = np.dot(Area, Y) / A
+    dx = X - cx
+    dy = Y - cy
+    J = np.array([[np.dot(Area, dx**2), np.dot(Area, dx * dy)], [np.dot(Area, dx * dy), np.dot(Area, dy**2)]])
+    lam, V = np.linalg.eigh(J / A)
+    L = V * np.sqrt(np.maximum(lam, 0))
+    P = _TRIANGLE @ L.T
+    return cx + P[:, 0], cy + P[:, 1], np.full(3, A / 3)
+
+
+# Функция возвращает опорные плоскости деформаций (плоскости x 3) [1/rx, 1/ry, eps0],
+# при которых крайние волокна сечения имеют деформации порядка epsRef в 8 направлениях
+def _referencePlanes(X, Y, epsRef):
+    planes = []
+    for theta in np.linspace(0, 2 * np.pi, 8, endpoint=False):
+        d = X * np.cos(theta) + Y * np.sin(theta)
+        h = max(d.max() - d.min(), 1e-12)
+        dmid = (d.max() + d.min()) / 2
+        for eps0 in (-epsRef, -epsRef / 2, 0):
+            k = 2 * epsRef / h
+            planes.append([k * np.cos(theta), k * np.sin(theta), eps0 - k * dmid])
+    return np.array(planes)
+
+
+# Функция укрупнения волокон бетонного сечения
+# Волокна рекурсивно делятся пополам по большему размеру группы; каждая группа заменяется тремя
+# волокнами, сохраняющими площадь, статические моменты и моменты инерции группы точно.
+# Деление продолжается, пока ошибка среднего напряжения в группе при опорных плоскостях деформаций
+# превышает tol от максимального напряжения диаграммы. planes - опорные плоскости [1/rx, 1/ry, eps0]
+# (по умолчанию строятся по деформации epsRef). Возвращает координаты и площади новых волокон,
+# номер новой группы для каждого исходного волокна и коэффициент сокращения числа волокон
+def reduceSection(ConcreteX, ConcreteY, ConcreteArea, sigmab_func, tol=0.01, epsRef=0.0035, planes=None):
+    ConcreteX = np.asarray(ConcreteX, dtype=float)
+    ConcreteY = np.asarray(ConcreteY, dtype=float)
+    ConcreteArea = np.asarray(ConcreteArea, dtype=float)
+    if planes is None:
+        planes = _referencePlanes(ConcreteX, ConcreteY, epsRef)
+    planes = np.atleast_2d(planes)
+    sigmaRef = np.abs(sigmab_func.sigma).max()
+    # Напряжения в исходных волокнах при всех опорных плоскостях (плоскости x волокна)
+    sigma = sigmab_func(planes[:, 2:3] + planes[:, 0:1] * ConcreteX + planes[:, 1:2] * ConcreteY)
+
+    X = []
+    Y = []
+    Area = []
+    labels = np.empty(len(ConcreteX), dtype=np.int64)
+    stack = [np.arange(len(ConcreteX))]
+    while stack:
+        idx = stack.pop()
+        if len(idx) <= 3:
+            # Малые группы сохраняются без изменений
+            Xg, Yg, Ag = ConcreteX[idx], ConcreteY[idx], ConcreteArea[idx]
+        else:
+            Xg, Yg, Ag = _lump(ConcreteX[idx], ConcreteY[idx], ConcreteArea[idx])
+            # Ошибка среднего напряжения группы при опорных плоскостях
+            mean = sigma[:, idx] @ ConcreteArea[idx] / ConcreteArea[idx].sum()
+            lumped = sigmab_func(planes[:, 2:3] + planes[:, 0:1] * Xg + planes[:, 1:2] * Yg).mean(axis=1)
+            if np.abs(mean - lumped).max() > tol * sigmaRef:
+                # Делим группу пополам по медиане вдоль большего размера
+                c = ConcreteX[idx] if np.ptp(ConcreteX[idx]) >= np.ptp(ConcreteY[idx]) else ConcreteY[idx]
+                order = np.argsort(c, kind="stable")
+                stack.append(idx[order[len(idx) // 2:]])
+                stack.append(idx[order[:len(idx) // 2]])
+                continue
+        labels[idx] = len(X)
+        X.append(Xg)
+        Y.append(Yg)
+        Area.append(Ag)
+    X = np.concatenate(X)
+    Y = np.concatenate(Y)
+    Area = np.concatenate(Area)
+    ratio = len(ConcreteX) / len(X)
+    return X, Y, Area, labels, ratio
@@ -1,10 +1,33 @@
+import hashlib
+import os
+import shutil
+import tempfile
 import numpy as np
-import gmsh
+import ConcreteModule
+import RebarModule
+import MshModule
+from MshModule import getElementGeometry, getMaterials, getGroupMaterial
+
+
+# Версия формата кэша сечений; увеличивается при изменении алгоритма импорта
+CACHE_VERSION = 2
+# Имена массивов, сохраняемых в кэше, в порядке возврата функцией getSectionInfo
+CACHE_ARRAYS = ("ConcreteTags", "ConcreteX", "ConcreteY", "ConcreteArea",
+                "RebarTags", "RebarDiam", "RebarArea", "RebarX", "RebarY")
+
+
+# Функция загружает gmsh при первом обращении, чтобы модули расчета импортировались без gmsh
+def _gmsh():
+    import gmsh
+    return gmsh
 
 
 # Функция для импорта и получения информации о сечении
-def getSectionInfo(file):
+# materials - словарь имен физических групп и классов материалов для сечений из нескольких материалов
+# (см. MshModule.getSectionInfo); в этом случае дополнительно возвращаются номера материалов ConcreteMat и RebarMat
+def getSectionInfo(file, materials=None):
     # Инициализация gmsh
+    gmsh = _gmsh()
     gmsh.initialize()
 
     # Импорт сечения
@@ -13,80 +36,94 @@ def getSectionInfo(file):
     # Получаем все элементарные объекты
     entities = gmsh.model.getEntities()
 
-    ConcreteTags = []
-    ConcreteX = []
-    ConcreteY = []
-    ConcreteArea = []
+    if materials is not None:
+        ConcreteMaterials, RebarMaterials = getMaterials(materials)
 
     RebarTags = []
     RebarDiam = []
-    RebarArea = []
+    RebarMat = []
     RebarX = []
     RebarY = []
+    ConcreteEntities = {}
 
     for e in entities:
         dim = e[0]
         tag = e[1]
-        # Get the mesh nodes for the entity (dim, tag):
-        nodeTags, nodeCoords, nodeParams = gmsh.model.mesh.getNodes(dim, tag)
-
-        # Get the mesh elements for the entity (dim, tag):
-        elemTypes, elemTags, elemNodeTags = gmsh.model.mesh.getElements(dim, tag)
-
         # * Does the entity belong to physical groups?
         physicalTags = gmsh.model.getPhysicalGroupsForEntity(dim, tag)
-        if len(physicalTags):
-            for p in physicalTags:
-                n = gmsh.model.getPhysicalName(dim, p)
-                if n == "Concrete":
-                    ConcretePG = p
-                if n.find("Rebar") > -1:
-                    RebarTags = np.append(RebarTags, [nodeTags])
-                    diam = float(n[6] + n[7]) / 1000  # Получаем диаметр арматуры из имени физической группы
-                    RebarDiam = np.append(RebarDiam, [diam])
-                    # Вычисляем площадь арматуры
-                    RebarArea = np.append(RebarArea, [(3.14 * diam**2)/4])
-                    # Получаем координаты арматур
-                    RebarX = np.append(RebarX, nodeCoords[0])
-                    RebarY = np.append(RebarY, nodeCoords[1])
-
-    # Получаем теги бетонного сечения
-    ConcreteEntity = gmsh.model.getEntitiesForPhysicalGroup(2, ConcretePG)
-    ConcreteTags = gmsh.model.mesh.getElements(2, ConcreteEntity[0])[1][0]
-
-    # Цикл по всем элементам сетки бетонного сечения
-    for i in ConcreteTags:
-        # Получаем номера узлов из которых состоит конечный элемент
-        Node1 = gmsh.model.mesh.getElement(i)[1][0]
-        Node2 = gmsh.model.mesh.getElement(i)[1][1]
-        Node3 = gmsh.model.mesh.getElement(i)[1][2]
-        # Получаем координаты узлов из которых состоит конечный элемент
-        X1 = float(gmsh.model.mesh.getNode(Node1)[0][0])
-        X2 = float(gmsh.model.mesh.getNode(Node2)[0][0])
-        X3 = float(gmsh.model.mesh.getNode(Node3)[0][0])
-        Y1 = float(gmsh.model.mesh.getNode(Node1)[0][1])
-        Y2 = float(gmsh.model.mesh.getNode(Node2)[0][1])
-        Y3 = float(gmsh.model.mesh.getNode(Node3)[0][1])
-        # Вычисляем координаты центра тяжести конечного элемента относительно начала координат
-        X0 = (X1+X2+X3)/3
-        Y0 = (Y1+Y2+Y3)/3
-        # Поворачиваем систему координат на 90 градусов
-        Y01 = Y0
-        Y0 = X0
-        X0 = -Y01
-        # Вычисляем площадь конечных элементов
-        Elem_Area = round(0.5 * abs((X2-X1)*(Y3-Y1)-(X3-X1)*(Y2-Y1)), 8)
-
-        ConcreteX = np.append(ConcreteX, [X0])
-        ConcreteY = np.append(ConcreteY, [Y0])
-        ConcreteArea = np.append(ConcreteArea, [Elem_Area])
+        for p in physicalTags:
+            n = gmsh.model.getPhysicalName(dim, p)
+            m = None if materials is None else getGroupMaterial(n, materials)
+            if materials is None:
+                if n == "Concrete" and dim == 2:
+                    ConcreteEntities[tag] = 0
+            elif dim == 2 and isinstance(m, ConcreteModule.ConcreteClass):
+                ConcreteEntities.setdefault(tag, [m is g for g in ConcreteMaterials].index(True))
+            if n.find("Rebar") > -1:
+                k = 0
+                if materials is not None:
+                    if not isinstance(m, RebarModule.RebarClass):
+                        raise ValueError("No rebar material for physical group " + n)
+                    k = [m is g for g in RebarMaterials].index(True)
+                # Get the mesh nodes for the entity (dim, tag):
+                nodeTags, nodeCoords, nodeParams = gmsh.model.mesh.getNodes(dim, tag)
+                diam = float(n[6] + n[7]) / 1000  # Получаем диаметр арматуры из имени физической группы
+                RebarTags.append(nodeTags)
+                RebarDiam.append(np.full(len(nodeTags), diam))
+                RebarMat.append(np.full(len(nodeTags), k))
+                # Получаем координаты арматур
+                RebarX.append(nodeCoords[0::3])
+                RebarY.append(nodeCoords[1::3])
+
+    RebarTags = np.concatenate(RebarTags) if RebarTags else np.zeros(0)
+    RebarDiam = np.concatenate(RebarDiam) if RebarDiam else np.zeros(0)
+    RebarMat = np.concatenate(RebarMat) if RebarMat else np.zeros(0, dtype=np.int64)
+    RebarX = np.concatenate(RebarX) if RebarX else np.zeros(0)
+    RebarY = np.concatenate(RebarY) if RebarY else np.zeros(0)
+    # Вычисляем площадь арматуры
+    RebarArea = (3.14 * RebarDiam**2)/4
+
+    # Получаем координаты всех узлов сетки одним вызовом и таблицу перехода от номера узла к строке массива
+    nodeTags, nodeCoords, nodeParams = gmsh.model.mesh.getNodes()
+    nodeCoords = nodeCoords.reshape(-1, 3)
+    nodeIndex = np.zeros(int(nodeTags.max()) + 1, dtype=np.int64)
+    nodeIndex[nodeTags] = np.arange(len(nodeTags))
 
+    ConcreteTags = []
+    ConcreteMat = []
+    ConcreteX = []
+    ConcreteY = []
+    ConcreteArea = []
+    # Элементы бетонного сечения получаем целыми блоками по типам элементов
+    for tag in ConcreteEntities:
+        elemTypes, elemTags, elemNodeTags = gmsh.model.mesh.getElements(2, tag)
+        for elemType, tags, nodes in zip(elemTypes, elemTags, elemNodeTags):
+            # Для элементов высокого порядка используются только угловые узлы
+            properties = gmsh.model.mesh.getElementProperties(elemType)
+            numNodes = properties[3]
+            numCorners = properties[5]
+            corners = nodeIndex[nodes.reshape(-1, numNodes)[:, :numCorners]]
+            X0, Y0, Elem_Area = getElementGeometry(nodeCoords[corners, 0], nodeCoords[corners, 1])
+            ConcreteTags.append(tags)
+            ConcreteMat.append(np.full(len(tags), ConcreteEntities[tag]))
+            ConcreteX.append(X0)
+            ConcreteY.append(Y0)
+            ConcreteArea.append(Elem_Area)
+
+    ConcreteTags = np.concatenate(ConcreteTags)
+    ConcreteMat = np.concatenate(ConcreteMat)
+    # Поворачиваем систему координат на 90 градусов
+    ConcreteX, ConcreteY = -np.concatenate(ConcreteY), np.concatenate(ConcreteX)
+    ConcreteArea = np.concatenate(ConcreteArea)
 
     # Поворачиваем систему координат на 90 градусов
     RebarY1 = RebarY
     RebarY = RebarX
     RebarX = - RebarY1
 
+    if materials is not None:
+        return (ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY,
+                ConcreteMat, RebarMat)
     return ConcreteTags, ConcreteX, ConcreteY, ConcreteArea, RebarTags, RebarDiam, RebarArea, RebarX, RebarY
 
 
@@ -96,4 +133,46 @@ def getXY(X, Y, ConcreteX, ConcreteY, RebarX, RebarY):
     ConcreteY = -(Y - ConcreteY)
     RebarX = -(X - RebarX)
     RebarY = -(Y - RebarY)
-    return ConcreteX, ConcreteY, RebarX, RebarY
\ No newline at end of file
+    return ConcreteX, ConcreteY, RebarX, RebarY
+
+
+# Функция возвращает ключ кэша по содержимому файла сетки и параметрам пересчета координат
+def getCacheKey(file, X=None, Y=None):
+    h = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    h.update(repr((CACHE_VERSION, X, Y)).encode())
+    return h.hexdigest()
+
+
+# Функция импорта сечения с кэшированием на диске
+# Массивы сечения хранятся в файлах .npy в папке cacheDir/<ключ> и при совпадении ключа
+# загружаются отображением в память без запуска gmsh. Если заданы X и Y, координаты
+# пересчитываются функцией getXY относительно точки (X, Y). Если gmsh не установлен,
+# сетка читается функцией MshModule.getSectionInfo
+def getSectionInfoCached(file, X=None, Y=None, cacheDir=".ndm_cache"):
+    path = os.path.join(cacheDir, getCacheKey(file, X, Y))
+    if os.path.isdir(path):
+        return tuple(np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in CACHE_ARRAYS)
+
+    try:
+        gmsh = _gmsh()
+    except ImportError:
+        arrays = list(MshModule.getSectionInfo(file))
+    else:
+        arrays = list(getSectionInfo(file))
+        gmsh.finalize()
+    if X is not None and Y is not None:
+        arrays[1], arrays[2], arrays[7], arrays[8] = getXY(X, Y, arrays[1], arrays[2], arrays[7], arrays[8])
+
+    # Записываем во временную папку и переименовываем, чтобы параллельные процессы не прочитали неполный кэш
+    os.makedirs(cacheDir, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=cacheDir)
+    for name, a in zip(CACHE_ARRAYS, arrays):
+        np.save(os.path.join(tmp, name + ".npy"), np.asarray(a))
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return tuple(np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in CACHE_ARRAYS)
@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import ConcreteModule
+import RebarModule
+import MshModule
+import ParametricModule
+import NdmModule
+import EnvelopeModule
+
+
+# Локальный сервис расчета по НДМ
+# Сервис работает постоянно и хранит загруженные сечения и диаграммы материалов в кэше LRU, поэтому
+# время ответа определяется временем расчета, а не временем запуска Python и импорта сетки.
+# Обмен - по строкам JSON (один запрос в строке, один ответ в строке) через Unix-сокет или TCP на localhost.
+# Запуск: python ServiceModule.py --socket /tmp/ndm.sock или python ServiceModule.py --port 8765
+#
+# Запрос расчета:
+# {"section": {"file": "Primer40SP52.msh", "X": -0.3, "Y": 0.2}
+#             или {"type": "rectangle", "b": 0.4, "h": 0.6, "cover": 0.05, "diam": 0.025, "size": 0.01},
+#  "concrete": {"class": "B25", "temp": 20, "Lambda": 1, "design": true},
+#  "rebar": {"class": "A400", "design": true},
+#  "loads": [[Nz, Mx, My], ...], "deltaMN": 0.001, "method": "secant", "fields": false}
+# Ответ: {"converged": [...], "message": [...], "iterations": [...], "epsbMin": [...], "epsbMax": [...],
+#         "epsSMin": [...], "epsSMax": [...], "sigmaSMax": [...]}, при "fields": true дополнительно массивы
+# напряжений и деформаций всех волокон. Для сечения без арматуры epsSMin и epsSMax равны null.
+# Запрос {"command": "stats"} возвращает сведения о кэше.
+# При ошибке возвращается {"error": "..."}
+
+
+# Параметрические сечения, доступные в запросах по полю "type"
+SECTION_TYPES = {
+    "rectangle": ParametricModule.rectangleSection,
+    "tee": ParametricModule.teeSection,
+    "i": ParametricModule.iSection,
+    "circle": ParametricModule.circleSection,
+}
+
+
+# Функция возвращает число для JSON; NaN (нет волокон) передается как null
+def _number(value):
+    return None if np.isnan(value) else float(value)
+
+
+# Класс кэша с вытеснением давно не использовавшихся элементов (LRU)
+class LRUCache:
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # Метод возвращает элемент по ключу; при отсутствии элемент создается функцией build
+    def Get(self, key, build):
+        if key in self.items:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return self.items[key]
+        self.misses += 1
+        value = build()
+        self.items[key] = value
+        if len(self.items) > self.maxsize:
+            self.items.popitem(last=False)
+        return value
+
+    def Stats(self):
+        return {"size": len(self.items), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+# Класс сервиса: кэши сечений и диаграмм и обработка запросов
+# Расчеты выполняются в одном рабочем потоке, поскольку рабочие массивы NDMSection используются повторно
+class NDMService:
+    def __init__(self, sections=32, diagrams=256, root="."):
+        self.sections = LRUCache(sections)
+        self.diagrams = LRUCache(diagrams)
+        self.root = root  # Папка, относительно которой задаются пути к файлам сетки
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.requests = 0
+
+    # Метод возвращает сечение NDMSection по описанию из запроса
+    def Section(self, spec):
+        spec = dict(spec)
+        if "file" in spec:
+            file = os.path.join(self.root, spec.pop("file"))
+            X = spec.pop("X", None)
+            Y = spec.pop("Y", None)
+            # Изменение файла сетки приводит к повторному чтению
+            key = ("file", os.path.abspath(file), os.stat(file).st_mtime_ns, X, Y)
+
+            def build():
+                info = MshModule.getSectionInfo(file)
+                ConcreteX, ConcreteY, RebarX, RebarY = info[1], info[2], info[7], info[8]
+                if X is not None and Y is not None:
+                    ConcreteX, ConcreteY, RebarX, RebarY = -(X - ConcreteX), -(Y - ConcreteY), -(X - RebarX), -(Y - RebarY)
+                return NdmModule.NDMSection(ConcreteX, ConcreteY, info[3], RebarX, RebarY, info[6])
+        else:
+            kind = spec.pop("type", None)
+            if kind not in SECTION_TYPES:
+                raise ValueError("Unknown section type: " + str(kind))
+            key = ("type", kind, tuple(sorted(spec.items())))
+
+            def build():
+                info = SECTION_TYPES[kind](**spec)
+                return NdmModule.NDMSection(info[1], info[2], info[3], info[7], info[8], info[6])
+        return self.sections.Get(key, build)
+
+    # Метод возвращает модуль упругости и диаграмму бетона по описанию из запроса
+    def Concrete(self, spec):
+        cls = getattr(ConcreteModule, spec.get("class", "B25"), None)
+        if not isinstance(cls, ConcreteModule.ConcreteClass):
+            raise ValueError("Unknown concrete class: " + str(spec.get("class")))
+        temp = float(spec.get("temp", 20))
+        Lambda = float(spec.get("Lambda", 1))
+        design = bool(spec.get("design", True))
+        key = ("concrete", spec.get("class", "B25"), temp, Lambda, design)
+
+        def build():
+            diagram = ConcreteModule.KarpenkoTemp(cls, temp, Lambda)
+            return cls.Eb, diagram.Design() if design else diagram.Normative()
+        return self.diagrams.Get(key, build)
+
+    # Метод возвращает модуль упругости и диаграмму арматуры по описанию из запроса
+    def Rebar(self, spec):
+        cls = getattr(RebarModule, spec.get("class", "A400"), None)
+        if not isinstance(cls, RebarModule.RebarClass):
+            raise ValueError("Unknown rebar class: " + str(spec.get("class")))
+        design = bool(spec.get("design", True))
+        key = ("rebar", spec.get("class", "A400"), design)
+
+        def build():
+            diagram = RebarModule.Rebar2L(cls)
+            return cls.Es, diagram.Design() if design else diagram.Normative()
+        return self.diagrams.Get(key, build)
+
+    # Метод выполняет расчет пакета загружений из запроса
+    def Solve(self, request):
+        section = self.Section(request["section"])
+        Eb, sigmab_func = self.Concrete(request.get("concrete", {}))
+        Es, sigmas_func = self.Rebar(request.get("rebar", {}))
+        loads = np.asarray(request["loads"], dtype=float).reshape(-1, 3)
+        deltaMN = float(request.get("deltaMN", 0.001))
+        method = request.get("method", "secant")
+        fields = bool(request.get("fields", False))
+        result = {key: [] for key in ("converged", "message", "iterations", "epsbMin", "epsbMax", "epsSMin", "epsSMax",
+                                      "sigmaSMax")}
+        if fields:
+            result.update(sigmab=[], epsb=[], sigmaS=[], epsS=[])
+        for Nz, Mx, My in loads:
+            sigmab, epsb, sigmaS, epsS, status = NdmModule.NDM(Nz, Mx, My, Eb, sigmab_func, Es, sigmas_func,
+                                                               None, None, None, None, None, None, deltaMN,
+                                                               method=method, fullOutput=True, section=section)
+            result["converged"].append(bool(status.converged))
+            result["message"].append(status.message)
+            result["iterations"].append(int(status.iterations))
+            for name, a in (("epsb", epsb), ("epsS", epsS)):
+                lo, hi = EnvelopeModule.getExtremes(a)
+                result[name + "Min"].append(_number(lo[0]))
+                result[name + "Max"].append(_number(hi[0]))
+            result["sigmaSMax"].append(float(np.abs(sigmaS).max(initial=0)))
+            if fields:
+                result["sigmab"].append(sigmab.tolist())
+                result["epsb"].append(epsb.tolist())
+                result["sigmaS"].append(sigmaS.tolist())
+                result["epsS"].append(epsS.tolist())
+        return result
+
+    # Метод обрабатывает один запрос и возвращает ответ (словарь для JSON)
+    def Handle(self, request):
+        self.requests += 1
+        try:
+            if request.get("command") == "stats":
+                return {"requests": self.requests, "sections": self.sections.Stats(), "diagrams": self.diagrams.Stats()}
+            return self.Solve(request)
+        except Exception as e:
+            return {"error": "%s: %s" % (type(e).__name__, e)}
+
+    # Обработка соединения: запросы читаются построчно, расчеты выполняются в рабочем потоке
+    async def Connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    response = {"error": "Invalid JSON: %s" % e}
+                else:
+                    response = await loop.run_in_executor(self.executor, self.Handle, request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    # Запуск сервиса на Unix-сокете path или на TCP-порту port (адрес host)
+    async def Serve(self, path=None, host="127.0.0.1", port=8765):
+        if path is not None:
+            if os.path.exists(path):
+                os.remove(path)
+            server = await asyncio.start_unix_server(self.Connection, path=path, limit=1 << 26)
+        else:
+            server = await asyncio.start_server(self.Connection, host=host, port=port, limit=1 << 26)
+        async with server:
+            await server.serve_forever()
+
+
+# Функция отправляет запрос сервису и возвращает ответ (для клиентских скриптов)
+# path - Unix-сокет сервиса; если не задан, используется TCP-соединение с host:port
+def request(message, path=None, host="127.0.0.1", port=8765):
+    if path is not None:
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.connect(path)
+    else:
+        s = socket.create_connection((host, port))
+    with s, s.makefile("rwb") as f:
+        f.write(json.dumps(message).encode() + b"\n")
+        f.flush()
+        return json.loads(f.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent NDM analysis service")
+    parser.add_argument("--socket", help="Unix socket path (default: TCP on localhost)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sections", type=int, default=32, help="LRU cache size for sections")
+    parser.add_argument("--diagrams", type=int, default=256, help="LRU cache size for material diagrams")
+    parser.add_argument("--root", default=".", help="directory for relative mesh paths")
+    args = parser.parse_args()
+    service = NDMService(args.sections, args.diagrams, args.root)
+    asyncio.run(service.Serve(args.socket, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
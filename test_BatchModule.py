@@ -0,0 +1,15 @@
+import pytest
+import BatchModule
+
+
+# Исполнитель batch не поддерживает метод Ньютона и ядро Numba: параметры отклоняются, а не игнорируются
+@pytest.mark.parametrize("option", [["--method", "newton"], ["--backend", "numba"]])
+def test_batch_rejects_unsupported_options(option, tmp_path):
+    loads = tmp_path / "loads.csv"
+    loads.write_text("Nz,Mx,My\n-1,0.05,0\n")
+    with pytest.raises(SystemExit) as error:
+        BatchModule.main(["rectangle:b=0.4,h=0.6,cover=0.05,diam=0.025", "--loads", str(loads),
+                          "--output", str(tmp_path / "results"), "--executor", "batch"] + option)
+    assert error.value.code == 2
+    with pytest.raises(ValueError):
+        BatchModule._batch(**{option[0][2:]: option[1]})
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+import ParametricModule
+import ExportModule
+
+h5py = pytest.importorskip("h5py")
+
+
+# Экспорт сечения без арматуры: массивы результатов арматуры имеют нулевую ширину
+def test_export_without_rebar(tmp_path):
+    info = ParametricModule.circleSection(0.4, 0.05, 0.02, n=0, size=0.05)
+    nb = len(info[1])
+    sigmab = np.random.default_rng(0).normal(size=(3, nb))
+    file = str(tmp_path / "results.h5")
+    ExportModule.exportResults(file, info[1], info[2], info[3], info[7], info[8], info[6],
+                               sigmab, sigmab * 1e-5, np.zeros((3, 0)), np.zeros((3, 0)), Nz=[-1, -2, -3], Mx=0, My=0)
+    with h5py.File(file) as f:
+        assert np.array_equal(f["Results/sigmab"][:], sigmab)
+        assert f["Results/sigmaS"].shape == (3, 0)
+        assert np.array_equal(f["Cases/loads"][:, 0], [-1, -2, -3])
+    xdmf = (tmp_path / "results.xdmf").read_text()
+    assert "TimeSeries_Concrete" in xdmf and "TimeSeries_Rebar" not in xdmf
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+import ConcreteModule
+import MshModule
+import NdmModule
+import ParametricModule
+import RebarModule
+import SectionModule
+
+
+# Прямоугольное сечение 0.4 x 0.6 м: координаты и площади волокон бетона и стержней
+def section():
+    info = ParametricModule.rectangleSection(0.4, 0.6, 0.05, 0.025, nx=3, size=0.02)
+    return info[1], info[2], info[3], info[7], info[8], info[6]
+
+
+# Диаграммы бетона B25 и арматуры A400
+def diagrams(concrete=ConcreteModule.B25):
+    return (concrete.Eb, ConcreteModule.KarpenkoTemp(concrete, 20, 1).Design(),
+            RebarModule.A400.Es, RebarModule.Rebar2L(RebarModule.A400).Design())
+
+
+# Материал без волокон (второй бетон в списке диаграмм) не влияет на результат
+def test_unused_material():
+    ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea = section()
+    Eb, sigmab, Es, sigmas = diagrams()
+    EbTop, sigmabTop = diagrams(ConcreteModule.B30)[:2]
+    single = NdmModule.NDM(-1.0, 0.1, 0.02, Eb, sigmab, Es, sigmas,
+                           ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, 0.0001)
+    multi = NdmModule.NDM(-1.0, 0.1, 0.02, [Eb, EbTop], [sigmab, sigmabTop], Es, sigmas,
+                          ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, 0.0001,
+                          ConcreteMat=np.zeros(len(ConcreteX), dtype=int))
+    for a, b in zip(single, multi):
+        assert np.allclose(a, b)
+
+
+# Номер материала вне списка диаграмм отклоняется
+def test_material_out_of_range():
+    ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea = section()
+    with pytest.raises(ValueError):
+        NdmModule.NDMSection(ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea,
+                             np.ones(len(ConcreteX), dtype=int), None, 1, 1)
+
+
+# Деформации, возвращаемые методом Ньютона, соответствуют плоскости деформаций состояния решателя
+# (в том числе при неудачном линейном поиске на последней итерации)
+def test_newton_strains_match_state():
+    info = MshModule.getSectionInfo("Primer10SP52.msh")
+    ConcreteX, ConcreteY, RebarX, RebarY = SectionModule.getXY(-0.04, 0.06, info[1], info[2], info[7], info[8])
+    sigmab = ConcreteModule.KarpenkoTemp(ConcreteModule.B25, 20, 1).Design()
+    sigmas = RebarModule.Rebar2L(RebarModule.A400SP52).Design()
+    sigmab, epsb, sigmaS, epsS, status = NdmModule.NDM(
+        0.3, 0.02, 0.01, ConcreteModule.B25.Eb, sigmab, RebarModule.A400SP52.Es, sigmas,
+        ConcreteX, ConcreteY, info[3], RebarX, RebarY, info[6], 0.001, method="newton", maxIter=60, fullOutput=True)
+    X = status.state.Plane()
+    assert np.allclose(epsb, X[0] * ConcreteX + X[1] * ConcreteY + X[2])
+    assert np.allclose(epsS, X[0] * RebarX + X[1] * RebarY + X[2])
+
+
+# Без fullOutput несходимость расчета сообщается предупреждением
+def test_not_converged_warning():
+    ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea = section()
+    Eb, sigmab, Es, sigmas = diagrams()
+    with pytest.warns(RuntimeWarning, match="did not converge"):
+        NdmModule.NDM(-1.0, 0.1, 0.02, Eb, sigmab, Es, sigmas,
+                      ConcreteX, ConcreteY, ConcreteArea, RebarX, RebarY, RebarArea, 0.0001, maxIter=2)
+
+
+# Пакет загружений (в том числе нулевое загружение и блоки меньше пакета) совпадает с расчетами NDM по одному
+def test_batch_matches_single():
+    geometry = section()
+    Eb, sigmab, Es, sigmas = diagrams()
+    Nz = np.array([-1.0, 0.0, -0.5, -2.0, -0.2])
+    Mx = np.array([0.1, 0.0, 0.05, 0.02, 0.12])
+    My = np.array([0.02, 0.0, -0.03, 0.0, 0.01])
+    result = NdmModule.NDMBatch(Nz, Mx, My, Eb, sigmab, Es, sigmas, *geometry, 0.0001, fullOutput=True, blockSize=2)
+    assert result[4].converged.all()
+    for k in range(len(Nz)):
+        single = NdmModule.NDM(Nz[k], Mx[k], My[k], Eb, sigmab, Es, sigmas, *geometry, 0.0001, fullOutput=True)
+        assert result[4].iterations[k] == single[4].iterations
+        for a, b in zip(result[:4], single[:4]):
+            assert np.allclose(a[k], b)
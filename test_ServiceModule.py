@@ -0,0 +1,35 @@
+import numpy as np
+import ServiceModule
+
+
+# Расчет сервиса для прямоугольного сечения; section - параметры сечения, loads - список [Nz, Mx, My]
+def solve(loads, **section):
+    spec = dict(type="rectangle", b=0.4, h=0.6, cover=0.05, diam=0.025, size=0.02)
+    spec.update(section)
+    return ServiceModule.NDMService().Solve({"section": spec, "loads": loads})
+
+
+# При центральном сжатии все волокна сжаты: максимальные деформации отрицательны и равны минимальным
+def test_fully_compressed_extremes():
+    result = solve([[-3.0, 0, 0]])
+    assert result["converged"] == [True]
+    assert result["epsbMax"][0] < 0
+    assert result["epsSMax"][0] < 0
+    assert np.isclose(result["epsbMin"][0], result["epsbMax"][0], rtol=1e-6)
+
+
+# При изгибе со сжатием минимальная деформация отрицательна, максимальная положительна
+def test_bending_extremes():
+    result = solve([[-0.5, 0.1, 0]])
+    assert result["converged"] == [True]
+    assert result["epsbMin"][0] < 0 < result["epsbMax"][0]
+
+
+# Для сечения без арматуры экстремумы деформаций арматуры не определены
+def test_no_rebar_extremes():
+    result = ServiceModule.NDMService().Solve({"section": {"type": "circle", "D": 0.4, "cover": 0.05, "diam": 0.02,
+                                                           "n": 0, "size": 0.02},
+                                               "loads": [[-0.5, 0, 0]]})
+    assert result["converged"] == [True]
+    assert result["epsSMin"] == [None] and result["epsSMax"] == [None]
+    assert result["epsbMax"][0] < 0